@@ -5,34 +5,80 @@ import numpy as np
 from quantum import QuantumCircuit, H
 
 
-def grover_search(num_qubits, oracle_fn, iterations=None):
+def oracle_mask(num_qubits, oracle_fn=None, targets=None, vectorized=False):
+    """Evaluate the oracle once and return a boolean mask of marked states.
+
+    Parameters
+    ----------
+    num_qubits: int
+        Number of qubits in the search space.
+    oracle_fn: callable, optional
+        Predicate marking the desired states.  It is called with each index,
+        or once with the full index array when ``vectorized`` is ``True``.
+    targets: iterable[int], optional
+        Indices to mark directly instead of (or in addition to) ``oracle_fn``.
+    vectorized: bool
+        Whether ``oracle_fn`` accepts an array of indices.
+    """
+    size = 2 ** num_qubits
+    mask = np.zeros(size, dtype=bool)
+    if oracle_fn is not None:
+        if vectorized:
+            mask |= np.asarray(oracle_fn(np.arange(size)), dtype=bool)
+        else:
+            mask |= np.fromiter((bool(oracle_fn(idx)) for idx in range(size)), bool, size)
+    if targets is not None:
+        mask[np.asarray(list(targets), dtype=np.int64)] = True
+    return mask
+
+
+def optimal_iterations(num_qubits, num_marked=1):
+    """Return the Grover iteration count for ``num_marked`` solutions."""
+    size = 2 ** num_qubits
+    if num_marked <= 0 or num_marked >= size:
+        return 0
+    return int(np.floor(np.pi / 4 * np.sqrt(size / num_marked)))
+
+
+def grover_search(num_qubits, oracle_fn=None, iterations=None, targets=None,
+                  vectorized=False, success_threshold=None):
     """Return circuit state after a number of Grover iterations.
 
     Parameters
     ----------
     num_qubits: int
         Number of qubits in the search space.
-    oracle_fn: callable
-        Function that marks the desired state. For now this is a placeholder.
+    oracle_fn: callable, optional
+        Function that marks the desired states; see :func:`oracle_mask`.
+    iterations: int, optional
+        Number of Grover iterations.  Defaults to the optimum for the number
+        of marked states.
+    targets: iterable[int], optional
+        Marked indices, for multi-target search without an oracle function.
+    vectorized: bool
+        Whether ``oracle_fn`` accepts an array of indices.
+    success_threshold: float, optional
+        Stop early once the probability of measuring a marked state reaches
+        this value.
     """
+    if oracle_fn is None and targets is None:
+        raise ValueError("either oracle_fn or targets must be given")
+    mask = oracle_mask(num_qubits, oracle_fn, targets, vectorized)
     qc = QuantumCircuit(num_qubits)
 
     if iterations is None:
-        iterations = int(np.floor(np.pi / 4 * np.sqrt(2 ** num_qubits)))
+        iterations = optimal_iterations(num_qubits, int(mask.sum()))
 
     # Prepare uniform superposition
     for q in range(num_qubits):
         qc.apply_gate(H, [q])
 
-    size = 2 ** num_qubits
-    psi0 = np.ones(size) / np.sqrt(size)
-    diffusion = 2 * np.outer(psi0, psi0) - np.eye(size)
-
     for _ in range(iterations):
-        for idx in range(size):
-            if oracle_fn(idx):
-                qc.state[idx] *= -1
-        qc.apply_unitary(diffusion)
+        if success_threshold is not None:
+            if qc.probabilities()[mask].sum() >= success_threshold:
+                break
+        qc.apply_phase_oracle(mask)
+        qc.apply_diffusion()
 
     return qc
 
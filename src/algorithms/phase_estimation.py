@@ -3,7 +3,7 @@
 import numpy as np
 
 from quantum import H, X, RZ, QuantumCircuit
-from quantum.transform import apply_inverse_qft
+from quantum.transform import apply_qft
 
 
 def estimate_phase(theta: float, precision: int = 3) -> str:
@@ -20,7 +20,7 @@ def estimate_phase(theta: float, precision: int = 3) -> str:
         angle = 2 ** q * theta
         qc.apply_controlled_gate(RZ(angle), q, precision)
 
-    qc.state = apply_inverse_qft(qc.state, precision, precision + 1)
+    qc.state = apply_qft(qc.state, range(precision), precision + 1, inverse=True)
     result = qc.measure_all()
     return result
 
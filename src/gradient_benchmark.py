@@ -0,0 +1,55 @@
+"""Measure VQE optimizer step time against the number of parameters."""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+from quantum import VariationalCircuit, VariationalQuantumEigensolver, X, Z
+
+
+class AlternatingAnsatz(VariationalCircuit):
+    """Layers of RX and RZ rotations cycling over the qubits."""
+
+    def parameterized_gates(self):
+        n = self.num_qubits
+        return [
+            (i, X if (i // n) % 2 == 0 else Z, i % n)
+            for i in range(len(self.parameters))
+        ]
+
+
+def benchmark(num_qubits, num_params, repeats=3):
+    """Return the mean optimizer step time in seconds for each gradient."""
+    rng = np.random.default_rng(0)
+    dim = 2 ** num_qubits
+    hamiltonian = np.diag(rng.normal(size=dim)).astype(complex)
+    timings = {}
+    for gradient in VariationalQuantumEigensolver.GRADIENTS:
+        ansatz = AlternatingAnsatz(num_qubits, rng.normal(size=num_params))
+        vqe = VariationalQuantumEigensolver(
+            ansatz, hamiltonian, iterations=repeats, gradient=gradient
+        )
+        start = time.perf_counter()
+        vqe.run()
+        timings[gradient] = (time.perf_counter() - start) / repeats
+    return timings
+
+
+def main():
+    num_qubits = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    print(f"{num_qubits} qubits")
+    print(f"{'params':>6} {'adjoint':>12} {'shift':>12} {'finite diff':>12}")
+    for num_params in (4, 16, 64, 128):
+        t = benchmark(num_qubits, num_params)
+        print(
+            f"{num_params:>6} {t['adjoint'] * 1e3:>10.2f}ms"
+            f" {t['parameter_shift'] * 1e3:>10.2f}ms"
+            f" {t['finite_difference'] * 1e3:>10.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare the in-place gate kernels against the reshape/transpose path."""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+from quantum.gates import H, CNOT
+from quantum.circuit import apply_single_qubit_gate
+from quantum.kernels import apply_1q_inplace, apply_2q_inplace
+
+
+def transpose_two_qubit_gate(state, gate, control, target, n):
+    """Reference two-qubit application used before the in-place kernels."""
+    state = state.reshape([2] * n)
+    axes = [control, target] + [i for i in range(n) if i not in (control, target)]
+    state = np.transpose(state, axes)
+    state = (gate @ state.reshape(4, -1)).reshape([2, 2] + [2] * (n - 2))
+    state = np.transpose(state, np.argsort(axes))
+    return state.reshape(2 ** n)
+
+
+def _time(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def benchmark(num_qubits, repeats=5):
+    """Return per-gate timings in seconds for both code paths."""
+    rng = np.random.default_rng(0)
+    state = rng.normal(size=2 ** num_qubits) + 1j * rng.normal(size=2 ** num_qubits)
+    state /= np.linalg.norm(state)
+    q, c, t = num_qubits // 2, 0, num_qubits - 1
+
+    def old_1q():
+        apply_single_qubit_gate(state, H, q, num_qubits)
+
+    def new_1q():
+        apply_1q_inplace(state, H, q, num_qubits)
+
+    def old_2q():
+        transpose_two_qubit_gate(state, CNOT, c, t, num_qubits)
+
+    def new_2q():
+        apply_2q_inplace(state, CNOT, c, t, num_qubits)
+
+    return {
+        "1q_transpose": _time(old_1q, repeats),
+        "1q_inplace": _time(new_1q, repeats),
+        "2q_transpose": _time(old_2q, repeats),
+        "2q_inplace": _time(new_2q, repeats),
+    }
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [12, 16, 20, 22]
+    print(f"{'qubits':>6} {'1q old':>10} {'1q new':>10} {'2q old':>10} {'2q new':>10}")
+    for n in sizes:
+        r = benchmark(n)
+        print(
+            f"{n:>6} {r['1q_transpose'] * 1e3:>8.2f}ms {r['1q_inplace'] * 1e3:>8.2f}ms"
+            f" {r['2q_transpose'] * 1e3:>8.2f}ms {r['2q_inplace'] * 1e3:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare single- and double-precision simulation speed and fidelity."""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+from quantum import QuantumCircuit, H, CNOT, RZ
+
+
+def random_circuit(num_qubits, layers, precision, seed=0):
+    """Run ``layers`` of H, RZ and a CNOT ladder; return the circuit and seconds."""
+    rng = np.random.default_rng(seed)
+    angles = rng.uniform(0, 2 * np.pi, size=(layers, num_qubits))
+    start = time.perf_counter()
+    qc = QuantumCircuit(num_qubits, precision=precision)
+    for layer in range(layers):
+        qc.apply_gate(H, range(num_qubits))
+        for q in range(num_qubits):
+            qc.apply_gate(RZ(angles[layer, q], precision), [q])
+        for q in range(layer % 2, num_qubits - 1, 2):
+            qc.apply_two_qubit_gate(CNOT, q, q + 1)
+    qc.probabilities()
+    return qc, time.perf_counter() - start
+
+
+def benchmark(num_qubits, layers=10):
+    """Return timings and the drift of single precision against double."""
+    double, t_double = random_circuit(num_qubits, layers, "double")
+    single, t_single = random_circuit(num_qubits, layers, "single")
+    reference = double.state
+    fidelity = abs(np.vdot(reference, single.state.astype(complex))) ** 2
+    drift = np.max(np.abs(double.probabilities() - single.probabilities()))
+    return {
+        "double": t_double,
+        "single": t_single,
+        "infidelity": 1 - fidelity,
+        "prob_error": drift,
+    }
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [12, 16, 20, 22]
+    print(f"{'qubits':>6} {'complex128':>11} {'complex64':>11} {'speedup':>8}"
+          f" {'1-fidelity':>11} {'max |dp|':>10}")
+    for n in sizes:
+        r = benchmark(n)
+        print(
+            f"{n:>6} {r['double'] * 1e3:>9.2f}ms {r['single'] * 1e3:>9.2f}ms"
+            f" {r['double'] / r['single']:>7.2f}x {r['infidelity']:>11.2e} {r['prob_error']:>10.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
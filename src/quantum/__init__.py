@@ -1,7 +1,15 @@
 """Quantum computing utilities for custom algorithms."""
 
 from .gates import H, X, Z, I, CNOT, S, T, RZ
+from .precision import set_precision, get_precision
+from .parallel import set_num_threads, get_num_threads
 from .circuit import QuantumCircuit
+from .ir import Instruction
+from .batched import BatchedCircuit
+from .density import DensityMatrixCircuit
+from .outofcore import MemmapCircuit
+from .stabilizer import StabilizerCircuit
+from .pauli import PauliSum
 from .advanced import (
     QuantumCompiler,
     SurfaceCode,
@@ -10,6 +18,7 @@ from .advanced import (
     DepolarizingChannel,
     AmplitudeDamping,
     PhaseDamping,
+    TrajectorySimulator,
     VariationalCircuit,
     Optimizer,
     VariationalQuantumEigensolver,
@@ -31,7 +40,17 @@ __all__ = [
     "S",
     "T",
     "RZ",
+    "set_precision",
+    "get_precision",
+    "set_num_threads",
+    "get_num_threads",
     "QuantumCircuit",
+    "Instruction",
+    "BatchedCircuit",
+    "DensityMatrixCircuit",
+    "MemmapCircuit",
+    "StabilizerCircuit",
+    "PauliSum",
     "QuantumCompiler",
     "SurfaceCode",
     "StabilizerMeasurement",
@@ -39,6 +58,7 @@ __all__ = [
     "DepolarizingChannel",
     "AmplitudeDamping",
     "PhaseDamping",
+    "TrajectorySimulator",
     "VariationalCircuit",
     "Optimizer",
     "VariationalQuantumEigensolver",
@@ -8,6 +8,7 @@ from .noise_models import (
     AmplitudeDamping,
     PhaseDamping,
 )
+from .trajectories import TrajectorySimulator
 from .variational import VariationalCircuit, Optimizer, VariationalQuantumEigensolver
 
 __all__ = [
@@ -18,6 +19,7 @@ __all__ = [
     "DepolarizingChannel",
     "AmplitudeDamping",
     "PhaseDamping",
+    "TrajectorySimulator",
     "VariationalCircuit",
     "Optimizer",
     "VariationalQuantumEigensolver",
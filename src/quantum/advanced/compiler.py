@@ -1,41 +1,284 @@
-"""Prototype compiler translating circuits to hardware instructions."""
+"""Prototype compiler translating circuits to hardware instructions.
+
+Before translation the operation log of a circuit is run through a pipeline
+of peephole passes over :class:`quantum.ir.Instruction` records:
+
+``drop_identities``
+    remove gates equal to the identity, e.g. ``RZ(0)``;
+``cancel_inverses``
+    remove adjacent pairs whose product is the identity (``H H``, ``X X``,
+    ``CNOT CNOT``, ``S S^dagger``);
+``merge_rotations``
+    fuse adjacent diagonal gates, or rotations about the same axis, on one
+    qubit into a single gate (``RZ(a) RZ(b) = RZ(a + b)``);
+``commute_diagonal``
+    move diagonal single-qubit gates earlier through operations they commute
+    with, such as the control of a ``CNOT``, so the other passes can combine
+    them.
+
+"Adjacent" means that no operation in between touches the same qubits.  The
+passes are repeated until the circuit stops shrinking.
+"""
+
+import numpy as np
 
 from quantum import QuantumCircuit
+from quantum.circuit import replay_operations
+from quantum.ir import (
+    Instruction,
+    gate_name,
+    GATE,
+    TWO_QUBIT,
+    CONTROLLED,
+    PHASE_ORACLE,
+    DIFFUSION,
+)
+
+_ROTATIONS = ("RX", "RY", "RZ", "P")
+
+
+def _is_diagonal(matrix, atol):
+    return not np.any(np.abs(matrix - np.diag(np.diag(matrix))) > atol)
+
+
+def _full_matrix(inst):
+    """Return the 4x4 matrix of a two-qubit instruction in qubit order."""
+    if inst.opcode == CONTROLLED:
+        full = np.eye(4, dtype=complex)
+        full[2:, 2:] = inst.matrix
+        return full
+    return inst.matrix
+
+
+def _qubits(inst, n):
+    if inst.opcode in (GATE, TWO_QUBIT, CONTROLLED):
+        return inst.qubits
+    return tuple(range(n))
+
+
+def gate_count(operations) -> int:
+    """Return the number of gate applications in ``operations``."""
+    return sum(
+        len(op.qubits) if op.opcode == GATE else 1
+        for op in map(Instruction.from_tuple, operations)
+    )
+
+
+def circuit_depth(operations, n) -> int:
+    """Return the number of layers when every operation is scheduled ASAP."""
+    level = [0] * n
+    for op in map(Instruction.from_tuple, operations):
+        if op.opcode == GATE:
+            for q in op.qubits:
+                level[q] += 1
+        else:
+            qubits = _qubits(op, n)
+            layer = max(level[q] for q in qubits) + 1
+            for q in qubits:
+                level[q] = layer
+    return max(level, default=0)
 
 
 class QuantumCompiler:
-    """Experimental quantum compiler interface."""
+    """Experimental quantum compiler interface.
+
+    Parameters
+    ----------
+    passes : iterable[str], optional
+        Names of the optimization passes to run, in order; all of
+        :attr:`PASSES` by default.
+    atol : float
+        Tolerance used when comparing matrices.
+    max_rounds : int
+        Upper bound on repetitions of the whole pipeline.
+    """
+
+    PASSES = ("drop_identities", "commute_diagonal", "merge_rotations", "cancel_inverses")
 
-    def compile(self, circuit: QuantumCircuit):
-        """Compile ``circuit`` to hardware-specific instructions."""
+    def __init__(self, passes=None, atol: float = 1e-10, max_rounds: int = 10):
+        passes = self.PASSES if passes is None else tuple(passes)
+        unknown = set(passes) - set(self.PASSES)
+        if unknown:
+            raise ValueError(f"unknown passes {sorted(unknown)}")
+        self.passes = passes
+        self.atol = atol
+        self.max_rounds = max_rounds
+        self.stats = []
+
+    def compile(self, circuit: QuantumCircuit, optimize: bool = False):
+        """Compile ``circuit`` to hardware-specific instructions.
+
+        By default every recorded operation is listed one to one.  With
+        ``optimize`` the operation log is first run through the pass
+        pipeline, and :attr:`stats` records its effect.
+        """
+        operations = getattr(circuit, "operations", [])
+        if optimize:
+            operations = self.run_passes(operations, circuit.num_qubits)
         instructions = []
-        for op in getattr(circuit, "operations", []):
-            kind = op[0]
+        for op in map(Instruction.from_tuple, operations):
+            kind = op.opcode
             if kind == "gate":
-                _, gate, qubits = op
-                name = _gate_name(gate)
-                instructions.append(f"APPLY {name} {qubits}")
+                instructions.append(f"APPLY {op.name} {list(op.qubits)}")
             elif kind == "two_qubit":
-                _, gate, c, t = op
-                name = _gate_name(gate)
-                instructions.append(f"APPLY2 {name} {c} {t}")
+                c, t = op.qubits
+                instructions.append(f"APPLY2 {op.name} {c} {t}")
             elif kind == "controlled":
-                _, gate, c, t = op
-                name = _gate_name(gate)
-                instructions.append(f"CTRL {c} {t} {name}")
+                c, t = op.qubits
+                instructions.append(f"CTRL {c} {t} {op.name}")
             elif kind == "unitary":
                 instructions.append("CUSTOM_UNITARY")
         return instructions
 
+    def optimize(self, circuit: QuantumCircuit):
+        """Return an optimized copy of ``circuit`` and the pass statistics.
+
+        The copy is rebuilt from ``|0...0>`` by replaying the optimized
+        operations, so it can be simulated, sampled or compiled like any
+        other circuit.
+        """
+        operations = self.run_passes(circuit.operations, circuit.num_qubits)
+        optimized = QuantumCircuit(
+            circuit.num_qubits,
+            lazy=getattr(circuit, "lazy", False),
+            precision=getattr(circuit, "dtype", None),
+            num_threads=getattr(circuit, "num_threads", None),
+        )
+        replay_operations(operations, optimized)
+        return optimized, self.stats
+
+    def run_passes(self, operations, n):
+        """Run the pass pipeline over ``operations`` and return the result.
+
+        :attr:`stats` is reset to a list of records ``{"pass", "round",
+        "gates", "depth"}``, one for the input (pass ``"input"``, round 0)
+        and one after every pass application.
+        """
+        ops = []
+        for op in map(Instruction.from_tuple, operations):
+            # Multi-qubit "gate" entries are split so each qubit can be optimized
+            if op.opcode == GATE and len(op.qubits) > 1:
+                ops.extend(Instruction(GATE, (q,), op.matrix) for q in op.qubits)
+            else:
+                ops.append(op)
+        self.stats = [self._record("input", 0, ops, n)]
+        for round_ in range(1, self.max_rounds + 1):
+            before = len(ops)
+            for name in self.passes:
+                ops = getattr(self, f"_{name}")(ops, n)
+                self.stats.append(self._record(name, round_, ops, n))
+            if len(ops) == before:
+                break
+        return ops
+
+    @staticmethod
+    def _record(name, round_, ops, n):
+        return {"pass": name, "round": round_, "gates": gate_count(ops),
+                "depth": circuit_depth(ops, n)}
+
+    def _drop_identities(self, ops, n):
+        kept = []
+        for op in ops:
+            if op.opcode in (GATE, TWO_QUBIT, CONTROLLED):
+                matrix = op.matrix
+                if np.ndim(matrix) == 2 and np.allclose(
+                    matrix, np.eye(len(matrix)), rtol=0, atol=self.atol
+                ):
+                    continue
+            kept.append(op)
+        return kept
+
+    def _peephole(self, ops, n, combine):
+        """Combine each operation with the previous one on the same qubits.
+
+        ``combine(previous, current)`` returns ``None`` to keep both, an empty
+        tuple to drop both or a one-element tuple with their replacement.
+        """
+        out = []
+        stacks = [[] for _ in range(n)]
+        for op in ops:
+            qubits = _qubits(op, n)
+            tops = {stacks[q][-1] if stacks[q] else None for q in qubits}
+            if len(tops) == 1 and None not in tops:
+                prev_idx = tops.pop()
+                prev = out[prev_idx]
+                if _qubits(prev, n) == qubits:
+                    result = combine(prev, op)
+                    if result is not None:
+                        if result:
+                            out[prev_idx] = result[0]
+                        else:
+                            out[prev_idx] = None
+                            for q in qubits:
+                                stacks[q].pop()
+                        continue
+            for q in qubits:
+                stacks[q].append(len(out))
+            out.append(op)
+        return [op for op in out if op is not None]
+
+    def _cancel_inverses(self, ops, n):
+        def combine(prev, op):
+            if prev.opcode != op.opcode or op.opcode not in (GATE, TWO_QUBIT, CONTROLLED):
+                return None
+            a, b = prev.matrix, op.matrix
+            if np.ndim(a) != 2 or np.ndim(b) != 2:
+                return None
+            if np.allclose(b @ a, np.eye(len(a)), rtol=0, atol=self.atol):
+                return ()
+            return None
+
+        return self._peephole(ops, n, combine)
+
+    def _merge_rotations(self, ops, n):
+        def combine(prev, op):
+            if prev.opcode != GATE or op.opcode != GATE:
+                return None
+            a, b = prev.matrix, op.matrix
+            if np.ndim(a) != 2 or np.ndim(b) != 2:
+                return None
+            same_axis = prev.name == op.name and prev.name in _ROTATIONS
+            if same_axis or (_is_diagonal(a, self.atol) and _is_diagonal(b, self.atol)):
+                return (Instruction(GATE, op.qubits, b @ a),)
+            return None
+
+        return self._peephole(ops, n, combine)
+
+    def _commutes(self, diag, q, other, n):
+        """Return whether the diagonal gate ``diag`` on ``q`` commutes with ``other``."""
+        if other.opcode == PHASE_ORACLE:
+            return True
+        if other.opcode not in (GATE, TWO_QUBIT, CONTROLLED) or np.ndim(other.matrix) != 2:
+            return other.opcode != DIFFUSION and q not in _qubits(other, n)
+        if q not in other.qubits:
+            return True
+        if other.opcode == GATE:
+            return _is_diagonal(other.matrix, self.atol)
+        if other.opcode == CONTROLLED and other.qubits[0] == q:
+            return True
+        local = np.kron(diag, np.eye(2)) if other.qubits[0] == q else np.kron(np.eye(2), diag)
+        full = _full_matrix(other)
+        return np.allclose(full @ local, local @ full, rtol=0, atol=self.atol)
+
+    def _commute_diagonal(self, ops, n):
+        ops = list(ops)
+        for i in range(len(ops)):
+            op = ops[i]
+            if op.opcode != GATE or np.ndim(op.matrix) != 2 or not _is_diagonal(op.matrix, self.atol):
+                continue
+            q = op.qubits[0]
+            j = i
+            while j > 0 and self._commutes(op.matrix, q, ops[j - 1], n):
+                j -= 1
+                # Stop next to another diagonal gate on q so they can merge
+                if ops[j].opcode == GATE and q in ops[j].qubits:
+                    j += 1
+                    break
+            if j < i:
+                ops.insert(j, ops.pop(i))
+        return ops
+
 
 def _gate_name(mat):
-    from quantum.gates import H, X, S, T, I
-
-    known = {
-        id(H): "H",
-        id(X): "X",
-        id(S): "S",
-        id(T): "T",
-        id(I): "I",
-    }
-    return known.get(id(mat), "U")
+    """Return the name of ``mat``, recognized by content rather than identity."""
+    return gate_name(mat)
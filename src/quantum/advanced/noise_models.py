@@ -1,8 +1,26 @@
-"""Simplified noise model abstractions."""
+"""Simplified noise model abstractions.
+
+Every channel acts independently on each qubit and describes itself through
+single-qubit Kraus operators (:meth:`NoiseModel.kraus_operators`), which the
+trajectory engine in :mod:`quantum.advanced.trajectories` samples from.  On a
+:class:`quantum.DensityMatrixCircuit` the ``apply`` methods apply the exact
+channel; on a state vector they keep the original direct edits.
+"""
 
 from quantum import QuantumCircuit
+from quantum.density import DensityMatrixCircuit
 import numpy as np
 
+_Y = np.array([[0, -1j], [1j, 0]], dtype=complex)
+
+
+def _bit_counts(values, n):
+    """Return the number of set bits of each entry of ``values``."""
+    counts = np.zeros(values.shape, dtype=np.int64)
+    for bit in range(n):
+        counts += (values >> bit) & 1
+    return counts
+
 
 class NoiseModel:
     """Base class for circuit noise models."""
@@ -15,6 +33,13 @@ class NoiseModel:
         """
         pass
 
+    def kraus_operators(self):
+        """Return the single-qubit Kraus operators of the channel.
+
+        The base implementation is the identity channel.
+        """
+        return [np.eye(2, dtype=complex)]
+
 
 class DepolarizingChannel(NoiseModel):
     """Depolarizing channel affecting all qubits equally."""
@@ -24,10 +49,22 @@ class DepolarizingChannel(NoiseModel):
 
     def apply(self, circuit: QuantumCircuit) -> None:
         """Mix the state with maximally mixed with probability ``p``."""
+        if isinstance(circuit, DensityMatrixCircuit):
+            circuit.apply_channel(self.kraus_operators())
+            return
         dim = 2 ** circuit.num_qubits
         mixed = np.ones(dim) / np.sqrt(dim)
         circuit.state = (1 - self.p) * circuit.state + self.p * mixed
 
+    def kraus_operators(self):
+        """Return Kraus operators of ``rho -> (1 - p) rho + p I / 2``."""
+        return [
+            np.sqrt(1 - 3 * self.p / 4) * np.eye(2, dtype=complex),
+            np.sqrt(self.p / 4) * np.array([[0, 1], [1, 0]], dtype=complex),
+            np.sqrt(self.p / 4) * _Y,
+            np.sqrt(self.p / 4) * np.array([[1, 0], [0, -1]], dtype=complex),
+        ]
+
 
 class AmplitudeDamping(NoiseModel):
     """Amplitude damping channel applied independently to each qubit."""
@@ -39,23 +76,24 @@ class AmplitudeDamping(NoiseModel):
 
     def apply(self, circuit: QuantumCircuit) -> None:
         """Apply amplitude damping with parameter ``gamma``."""
+        if isinstance(circuit, DensityMatrixCircuit):
+            circuit.apply_channel(self.kraus_operators())
+            return
         n = circuit.num_qubits
-        state = circuit.state.copy()
-        for q in range(n):
-            damped = np.zeros_like(state)
-            sqrt_keep = np.sqrt(1 - self.gamma)
-            sqrt_decay = np.sqrt(self.gamma)
-            for idx, amp in enumerate(state):
-                if amp == 0:
-                    continue
-                bit = (idx >> q) & 1
-                if bit == 0:
-                    damped[idx] += amp
-                else:
-                    damped[idx] += sqrt_keep * amp
-                    damped[idx & ~(1 << q)] += sqrt_decay * amp
-            state = damped
-        circuit.state = state
+        sqrt_keep = np.sqrt(1 - self.gamma)
+        sqrt_decay = np.sqrt(self.gamma)
+        state = np.array(circuit.state, dtype=complex).reshape([2] * n)
+        for axis in range(n):
+            a0 = np.take(state, 0, axis=axis)
+            a1 = np.take(state, 1, axis=axis)
+            state = np.stack([a0 + sqrt_decay * a1, sqrt_keep * a1], axis=axis)
+        circuit.state = state.reshape(2 ** n)
+
+    def kraus_operators(self):
+        return [
+            np.array([[1, 0], [0, np.sqrt(1 - self.gamma)]], dtype=complex),
+            np.array([[0, np.sqrt(self.gamma)], [0, 0]], dtype=complex),
+        ]
 
 
 class PhaseDamping(NoiseModel):
@@ -67,14 +105,21 @@ class PhaseDamping(NoiseModel):
         self.lam = lam
 
     def apply(self, circuit: QuantumCircuit) -> None:
+        if isinstance(circuit, DensityMatrixCircuit):
+            circuit.apply_channel(self.kraus_operators())
+            return
         n = circuit.num_qubits
-        dim = 2 ** n
+        indices = np.arange(2 ** n)
         rho = np.outer(circuit.state, circuit.state.conjugate())
-        for q in range(n):
-            for i in range(dim):
-                for j in range(dim):
-                    if ((i ^ j) >> q) & 1:
-                        rho[i, j] *= 1 - self.lam
+        # Each differing bit between row and column costs a factor (1 - lam)
+        rho *= (1 - self.lam) ** _bit_counts(indices[:, None] ^ indices[None, :], n)
         vals, vecs = np.linalg.eigh(rho)
         idx = np.argmax(vals)
         circuit.state = vecs[:, idx] * np.sqrt(vals[idx])
+
+    def kraus_operators(self):
+        """Return Kraus operators scaling coherences by ``1 - lam``."""
+        return [
+            np.sqrt(1 - self.lam / 2) * np.eye(2, dtype=complex),
+            np.sqrt(self.lam / 2) * np.array([[1, 0], [0, -1]], dtype=complex),
+        ]
@@ -0,0 +1,127 @@
+"""Quantum-trajectory (Monte Carlo wavefunction) noise simulation.
+
+Instead of editing a single state vector, every trajectory is a pure state
+that, after each gate, has one Kraus operator of the noise channel applied
+to every qubit the gate touched.  The operator is drawn with probability
+``||K_k psi||^2``, and the state is renormalized.  Averaging observables over
+many trajectories reproduces the mixed-state statistics of the channel in
+``O(trajectories * 2^n)`` memory.  All trajectories are stored as rows of a
+:class:`quantum.BatchedCircuit`, so each gate and each Kraus draw is a
+single vectorized call.
+"""
+
+import numpy as np
+
+from quantum import BatchedCircuit
+from quantum.batched import apply_pair_batched
+from quantum.circuit import replay_operations
+from quantum.kernels import default_workspace, single_qubit_views
+from quantum.measurement import cumulative_distribution, sample_indices, format_bitstrings
+
+
+class TrajectorySimulator:
+    """Noisy simulator averaging over stochastic pure-state trajectories.
+
+    Parameters
+    ----------
+    num_qubits : int
+        Number of qubits in the register.
+    noise_model : NoiseModel, optional
+        Channel providing ``kraus_operators()``; noiseless when ``None``.
+    trajectories : int
+        Number of trajectories simulated in parallel.
+    seed : int, optional
+        Seed for the Kraus-operator draws.
+    """
+
+    def __init__(self, num_qubits: int, noise_model=None, trajectories: int = 100, seed=None):
+        self.num_qubits = num_qubits
+        self.trajectories = trajectories
+        self.batch = BatchedCircuit(num_qubits, trajectories)
+        self.rng = np.random.default_rng(seed)
+        kraus = None if noise_model is None else noise_model.kraus_operators()
+        if kraus is not None and len(kraus) == 1 and np.allclose(kraus[0], np.eye(2)):
+            kraus = None
+        self.kraus = None if kraus is None else np.asarray(kraus, dtype=complex)
+        if self.kraus is not None:
+            # K_k^dagger K_k, used to get branch probabilities from 2x2 moments
+            self._gram = np.einsum("kji,kjl->kil", self.kraus.conj(), self.kraus)
+
+    @property
+    def operations(self):
+        return self.batch.operations
+
+    @property
+    def states(self):
+        """``(trajectories, 2^n)`` array of trajectory state vectors."""
+        return self.batch.state
+
+    def _apply_noise(self, qubits):
+        if self.kraus is None:
+            return
+        workspace = default_workspace()
+        rows = np.arange(self.trajectories)
+        for q in qubits:
+            a0, a1 = single_qubit_views(self.batch.state, q, self.num_qubits)
+            r00 = np.sum(np.abs(a0) ** 2, axis=(1, 2))
+            r11 = np.sum(np.abs(a1) ** 2, axis=(1, 2))
+            r01 = np.sum(a0.conj() * a1, axis=(1, 2))
+            gram = self._gram
+            # p_k = <psi| K_k^dagger K_k |psi> from the reduced 2x2 moments
+            probs = (
+                gram[:, 0, 0, None].real * r00
+                + gram[:, 1, 1, None].real * r11
+                + 2 * (gram[:, 0, 1, None] * r01).real
+            )
+            cumulative = np.cumsum(probs, axis=0)
+            draws = self.rng.random(self.trajectories) * cumulative[-1]
+            choice = np.minimum((cumulative < draws).sum(axis=0), len(self.kraus) - 1)
+            scale = 1 / np.sqrt(np.maximum(probs[choice, rows], 1e-300))
+            apply_pair_batched(a0, a1, self.kraus[choice] * scale[:, None, None], workspace)
+
+    def apply_gate(self, gate, qubits):
+        self.batch.apply_gate(gate, qubits)
+        self._apply_noise(qubits)
+
+    def apply_two_qubit_gate(self, gate, control, target):
+        self.batch.apply_two_qubit_gate(gate, control, target)
+        self._apply_noise((control, target))
+
+    def apply_controlled_gate(self, gate, control, target):
+        self.batch.apply_controlled_gate(gate, control, target)
+        self._apply_noise((control, target))
+
+    def apply_unitary(self, unitary):
+        self.batch.apply_unitary(unitary)
+        self._apply_noise(range(self.num_qubits))
+
+    def apply_phase_oracle(self, mask):
+        self.batch.apply_phase_oracle(mask)
+        self._apply_noise(range(self.num_qubits))
+
+    def apply_diffusion(self):
+        self.batch.apply_diffusion()
+        self._apply_noise(range(self.num_qubits))
+
+    def run(self, circuit):
+        """Replay ``circuit.operations`` from ``|0...0>`` with noise; return ``self``."""
+        return replay_operations(circuit.operations, self)
+
+    def probabilities(self):
+        """Return basis-state probabilities averaged over all trajectories."""
+        return self.batch.probabilities().mean(axis=0)
+
+    def expectation(self, observable) -> float:
+        """Return the trajectory-averaged expectation value of ``observable``."""
+        return np.real(self.batch.expectation(observable)).mean()
+
+    def sample(self, shots, seed=None):
+        """Return a ``{bitstring: count}`` histogram of noisy measurements."""
+        rng = np.random.default_rng(seed) if seed is not None else None
+        cdf = cumulative_distribution(self.probabilities())
+        values, counts = np.unique(sample_indices(cdf, shots, rng), return_counts=True)
+        return dict(zip(format_bitstrings(values, self.num_qubits), counts.tolist()))
+
+    def measure_all(self):
+        """Return one noisy measurement of the register."""
+        return next(iter(self.sample(1)))
@@ -1,55 +1,130 @@
 """Templates for variational quantum algorithms."""
 
+import inspect
+
 import numpy as np
-from quantum import QuantumCircuit, RZ
+from quantum import QuantumCircuit, BatchedCircuit, Z
+from quantum.gates import rotation
+from .gradients import (
+    finite_difference_gradient,
+    parameter_shift_gradient,
+    adjoint_gradient,
+)
+
+
+def _accepts_gradient(step) -> bool:
+    """Return whether an optimizer ``step`` takes a ``gradient_fn`` argument."""
+    try:
+        parameters = inspect.signature(step).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(
+        p.name == "gradient_fn" or p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters
+    )
+
 
 class VariationalCircuit:
-    """Base class for parameterized circuits."""
+    """Base class for parameterized circuits.
+
+    The ansatz is described by :meth:`parameterized_gates`; subclasses override
+    it to change the circuit, and both :meth:`construct` and the gradient
+    engines follow the same description.
+    """
 
     def __init__(self, num_qubits: int, parameters):
         self.num_qubits = num_qubits
         self.parameters = list(parameters)
 
-    def construct(self):
-        """Construct the circuit using current parameters."""
+    def parameterized_gates(self):
+        """Return ``(parameter_index, generator, qubit)`` for each rotation.
+
+        Rotation ``k`` applies ``exp(-i theta G / 2)`` to ``qubit``; the default
+        ansatz is an ``RZ`` on qubit ``i % num_qubits`` for every parameter.
+        """
+        return [(i, Z, i % self.num_qubits) for i in range(len(self.parameters))]
+
+    def construct(self, parameters=None):
+        """Construct the circuit using ``parameters`` or the current parameters."""
+        if parameters is None:
+            parameters = self.parameters
         qc = QuantumCircuit(self.num_qubits)
-        for i, theta in enumerate(self.parameters):
-            qc.apply_gate(RZ(theta), [i % self.num_qubits])
+        for i, generator, qubit in self.parameterized_gates():
+            qc.apply_gate(rotation(generator, parameters[i]), [qubit])
+        return qc
+
+    def construct_batch(self, parameter_sets):
+        """Construct one circuit per row of ``parameter_sets`` in a single batch.
+
+        ``parameter_sets`` has shape ``(batch, len(parameters))``; each gate is
+        applied to the whole batch with per-row angles.
+        """
+        parameter_sets = np.atleast_2d(np.asarray(parameter_sets, dtype=float))
+        qc = BatchedCircuit(self.num_qubits, len(parameter_sets))
+        for i, generator, qubit in self.parameterized_gates():
+            qc.apply_gate(rotation(generator, parameter_sets[:, i]), [qubit])
         return qc
 
 
 class Optimizer:
     """Simple optimizer interface for variational circuits."""
 
-    def step(self, objective_fn, params):
+    def step(self, objective_fn, params, gradient_fn=None):
+        """Take one gradient-descent step.
+
+        ``gradient_fn`` returns the gradient at ``params``; central finite
+        differences of ``objective_fn`` are used when it is omitted.
+        """
         lr = 0.1
-        grads = np.zeros_like(params, dtype=float)
-        for i in range(len(params)):
-            plus = params.copy()
-            minus = params.copy()
-            plus[i] += 1e-3
-            minus[i] -= 1e-3
-            grads[i] = (objective_fn(plus) - objective_fn(minus)) / 2e-3
+        if gradient_fn is None:
+            grads = finite_difference_gradient(objective_fn, params)
+        else:
+            grads = gradient_fn(params)
         return params - lr * grads
 
 
 class VariationalQuantumEigensolver:
-    """Estimate ground state energy of ``hamiltonian`` using variational ansatz."""
+    """Estimate ground state energy of ``hamiltonian`` using variational ansatz.
+
+    ``hamiltonian`` is a dense matrix or a :class:`quantum.PauliSum`.
+    ``gradient`` selects how the optimizer obtains gradients: ``"adjoint"``
+    (default), ``"parameter_shift"`` or ``"finite_difference"``.
+    """
 
-    def __init__(self, ansatz: VariationalCircuit, hamiltonian: np.ndarray, optimizer=None, iterations: int = 100):
+    GRADIENTS = ("adjoint", "parameter_shift", "finite_difference")
+
+    def __init__(self, ansatz: VariationalCircuit, hamiltonian, optimizer=None, iterations: int = 100, gradient: str = "adjoint"):
+        if gradient not in self.GRADIENTS:
+            raise ValueError(f"gradient must be one of {self.GRADIENTS}")
         self.ansatz = ansatz
         self.hamiltonian = hamiltonian
         self.optimizer = optimizer or Optimizer()
         self.iterations = iterations
+        self.gradient = gradient
 
     def _energy(self, params):
         self.ansatz.parameters = list(params)
         circuit = self.ansatz.construct()
         return np.real(circuit.expectation(self.hamiltonian))
 
+    def _energies(self, parameter_sets):
+        """Return the energy of every row of ``parameter_sets`` in one batch."""
+        batch = self.ansatz.construct_batch(parameter_sets)
+        return np.real(batch.expectation(self.hamiltonian))
+
+    def gradient_fn(self, params):
+        """Return the energy gradient at ``params`` using ``self.gradient``."""
+        if self.gradient == "adjoint":
+            return adjoint_gradient(self.ansatz, self.hamiltonian, params)
+        if self.gradient == "parameter_shift":
+            return parameter_shift_gradient(self._energies, params)
+        return finite_difference_gradient(self._energy, params)
+
     def run(self) -> float:
         params = np.array(self.ansatz.parameters, dtype=float)
+        # Optimizers written against ``step(objective_fn, params)`` compute
+        # their own gradients
+        kwargs = {"gradient_fn": self.gradient_fn} if _accepts_gradient(self.optimizer.step) else {}
         for _ in range(self.iterations):
-            params = self.optimizer.step(self._energy, params)
+            params = self.optimizer.step(self._energy, params, **kwargs)
         self.ansatz.parameters = list(params)
         return self._energy(params)
@@ -0,0 +1,213 @@
+"""Batched state-vector simulation of many circuits with one gate sequence.
+
+:class:`BatchedCircuit` stores ``batch_size`` state vectors as rows of a
+``(batch, 2^n)`` array and exposes the gate API of
+:class:`quantum.QuantumCircuit`.  Every gate is applied to all rows in one
+vectorized call.  Gates may be shared by the whole batch (a ``2x2`` or
+``4x4`` matrix) or given per row as a stack of shape ``(batch, 2, 2)`` or
+``(batch, 4, 4)``, e.g. ``RZ(thetas)`` for an array of angles.
+"""
+
+import numpy as np
+
+from .circuit import QuantumCircuit
+from .kernels import (
+    default_workspace,
+    single_qubit_views,
+    two_qubit_views,
+    apply_1q_inplace,
+    apply_2q_inplace,
+    apply_controlled_inplace,
+    scratch_blocks,
+)
+from .ir import Instruction, GATE, TWO_QUBIT, CONTROLLED, UNITARY, PHASE_ORACLE, DIFFUSION
+from .precision import resolve_dtype
+from .measurement import marginal_probabilities, format_bitstrings
+from .pauli import PauliSum
+
+
+def _is_diagonal(gates, atol=1e-12):
+    dim = gates.shape[-1]
+    return not np.any(np.abs(gates[:, ~np.eye(dim, dtype=bool)]) > atol)
+
+
+def apply_pair_batched(a0, a1, gates, workspace=None):
+    """Apply one 2x2 gate per batch row to the amplitude pair ``(a0, a1)``.
+
+    ``a0`` and ``a1`` are the views of :func:`quantum.kernels.single_qubit_views`
+    on a ``(batch, 2^n)`` state and ``gates`` has shape ``(batch, 2, 2)``.
+    Both views are updated in place.
+    """
+    workspace = workspace or default_workspace()
+    shape = (len(gates),) + (1,) * (a0.ndim - 1)
+    g00, g01, g10, g11 = (gates[:, i, j].reshape(shape) for i, j in np.ndindex(2, 2))
+    if _is_diagonal(gates):
+        a0 *= g00
+        a1 *= g11
+        return
+    s0, s1 = scratch_blocks(workspace.scratch(2 * a0.size, a0.dtype), 2, a0.shape)
+    np.multiply(a0, g00, out=s0)
+    np.multiply(a1, g01, out=s1)
+    s0 += s1
+    np.multiply(a0, g10, out=s1)
+    a1 *= g11
+    a1 += s1
+    a0[...] = s0
+
+
+def _apply_quad_batched(views, gates, workspace):
+    """Apply one 4x4 gate per batch row to the four two-qubit amplitude views."""
+    shape = (len(gates),) + (1,) * (views[0].ndim - 1)
+    if _is_diagonal(gates):
+        for k in range(4):
+            views[k] *= gates[:, k, k].reshape(shape)
+        return
+    scratch = workspace.scratch(5 * views[0].size, views[0].dtype)
+    out = scratch_blocks(scratch, 5, views[0].shape)
+    tmp = out.pop()
+    for k in range(4):
+        np.multiply(views[0], gates[:, k, 0].reshape(shape), out=out[k])
+        for j in range(1, 4):
+            np.multiply(views[j], gates[:, k, j].reshape(shape), out=tmp)
+            out[k] += tmp
+    for k in range(4):
+        views[k][...] = out[k]
+
+
+class BatchedCircuit:
+    """State-vector simulator for a batch of circuits sharing one gate sequence.
+
+    Parameters
+    ----------
+    num_qubits : int
+        Number of qubits in each circuit.
+    batch_size : int
+        Number of circuits simulated together.
+    precision : {"single", "double"} or dtype, optional
+        Precision of the states; the global default when omitted.
+    """
+
+    def __init__(self, num_qubits: int, batch_size: int, precision=None):
+        self.num_qubits = num_qubits
+        self.batch_size = batch_size
+        self.dtype = resolve_dtype(precision)
+        self.state = np.zeros((batch_size, 2 ** num_qubits), dtype=self.dtype)
+        self.state[:, 0] = 1
+        self.operations = []
+
+    def _gate_stack(self, gate, dim):
+        """Return ``gate`` as a per-row stack, or ``None`` if it is shared."""
+        gate = np.asarray(gate)
+        if gate.shape == (dim, dim):
+            return None
+        if gate.shape != (self.batch_size, dim, dim):
+            raise ValueError(
+                f"gate must have shape ({dim}, {dim}) or ({self.batch_size}, {dim}, {dim})"
+            )
+        return gate.astype(self.dtype, copy=False)
+
+    def apply_gate(self, gate, qubits):
+        """Apply a shared or per-row single-qubit gate to ``qubits``."""
+        stack = self._gate_stack(gate, 2)
+        workspace = default_workspace()
+        for q in qubits:
+            if stack is None:
+                apply_1q_inplace(self.state, gate, q, self.num_qubits, workspace)
+            else:
+                a0, a1 = single_qubit_views(self.state, q, self.num_qubits)
+                apply_pair_batched(a0, a1, stack, workspace)
+        self.operations.append(Instruction(GATE, qubits, gate))
+
+    def apply_two_qubit_gate(self, gate, control, target):
+        """Apply a shared or per-row 4x4 gate to ``(control, target)``."""
+        if control == target:
+            raise ValueError("control and target must be different")
+        stack = self._gate_stack(gate, 4)
+        if stack is None:
+            apply_2q_inplace(self.state, gate, control, target, self.num_qubits)
+        else:
+            views = two_qubit_views(self.state, control, target, self.num_qubits)
+            _apply_quad_batched(views, stack, default_workspace())
+        self.operations.append(Instruction(TWO_QUBIT, (control, target), gate))
+
+    def apply_controlled_gate(self, gate, control, target):
+        """Apply a shared or per-row controlled single-qubit gate."""
+        if control == target:
+            raise ValueError("control and target must be different")
+        stack = self._gate_stack(gate, 2)
+        if stack is None:
+            apply_controlled_inplace(self.state, gate, control, target, self.num_qubits)
+        else:
+            views = two_qubit_views(self.state, control, target, self.num_qubits)
+            apply_pair_batched(views[2], views[3], stack, default_workspace())
+        self.operations.append(Instruction(CONTROLLED, (control, target), gate))
+
+    def apply_unitary(self, unitary):
+        """Apply a full unitary matrix (shared or per row) to every state."""
+        unitary = np.asarray(unitary).astype(self.dtype, copy=False)
+        if unitary.ndim == 2:
+            self.state = self.state @ unitary.T
+        else:
+            self.state = np.einsum("bij,bj->bi", unitary, self.state)
+        self.operations.append(Instruction(UNITARY, (), unitary))
+
+    def apply_phase_oracle(self, mask):
+        """Flip the sign of the amplitudes marked in ``mask`` in every row."""
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (2 ** self.num_qubits,):
+            raise ValueError("mask dimension mismatch")
+        self.state[:, mask] *= -1
+        self.operations.append(Instruction(PHASE_ORACLE, (), mask))
+
+    def apply_diffusion(self):
+        """Reflect every row about the uniform superposition."""
+        mean = self.state.mean(axis=1, keepdims=True, dtype=complex)
+        np.negative(self.state, out=self.state)
+        self.state += 2 * mean
+        self.operations.append(Instruction(DIFFUSION))
+
+    def circuit(self, index):
+        """Return a :class:`quantum.QuantumCircuit` holding row ``index``.
+
+        Per-row gate stacks in ``operations`` are reduced to the matrix of
+        that row, so the log describes the returned circuit alone.
+        """
+        qc = QuantumCircuit(self.num_qubits, precision=self.dtype)
+        qc.state = self.state[index].copy()
+        qc.operations = [
+            Instruction(op.opcode, op.qubits, op.data[index])
+            if op.opcode != PHASE_ORACLE and np.ndim(op.data) == 3 else op
+            for op in self.operations
+        ]
+        return qc
+
+    def probabilities(self):
+        """Return a ``(batch, 2^n)`` array of basis-state probabilities."""
+        return np.square(np.abs(self.state), dtype=np.float64)
+
+    def marginal_probabilities(self, qubits):
+        """Return a ``(batch, 2^k)`` array of marginals over ``qubits``."""
+        return np.stack([
+            marginal_probabilities(row, qubits, self.num_qubits) for row in self.state
+        ])
+
+    def expectation(self, observable) -> np.ndarray:
+        """Return the expectation value of ``observable`` for every row.
+
+        ``observable`` is a dense matrix or a :class:`quantum.pauli.PauliSum`.
+        """
+        if isinstance(observable, PauliSum):
+            return observable.expectation(self.state)
+        dim = 2 ** self.num_qubits
+        if observable.shape != (dim, dim):
+            raise ValueError("observable dimension mismatch")
+        return np.einsum(
+            "bi,bi->b", self.state.conj(), self.state @ observable.T, dtype=complex
+        )
+
+    def measure_all(self):
+        """Return one bitstring sample per batch row."""
+        cdf = np.cumsum(self.probabilities(), axis=1)
+        uniform = np.random.random_sample((self.batch_size, 1)) * cdf[:, -1:]
+        outcomes = np.minimum((cdf <= uniform).sum(axis=1), cdf.shape[1] - 1)
+        return format_bitstrings(outcomes, self.num_qubits)
@@ -4,6 +4,19 @@ from functools import reduce
 import numpy as np
 
 from .gates import I
+from .precision import resolve_dtype
+from .kernels import apply_1q_inplace, apply_2q_inplace, apply_controlled_inplace
+from .fusion import FusionQueue
+from .ir import Instruction, GATE, TWO_QUBIT, CONTROLLED, UNITARY, PHASE_ORACLE, DIFFUSION
+from .pauli import PauliSum
+from .measurement import (
+    marginal_probabilities,
+    collapse,
+    cumulative_distribution,
+    sample_indices,
+    outcome_bits,
+    format_bitstrings,
+)
 
 
 def tensor(*matrices):
@@ -20,21 +33,134 @@ def apply_single_qubit_gate(state, gate, qubit, n):
     return state.reshape(2 ** n)
 
 
+def replay_operations(operations, target):
+    """Apply a recorded ``QuantumCircuit.operations`` log to ``target``.
+
+    ``target`` is any object exposing the ``QuantumCircuit`` gate API, such as
+    a :class:`quantum.BatchedCircuit`.  Entries may be
+    :class:`quantum.ir.Instruction` records or legacy operation tuples.
+    """
+    for op in operations:
+        Instruction.from_tuple(op).apply(target)
+    return target
+
+
 class QuantumCircuit:
-    """Simple state-vector simulator."""
+    """Simple state-vector simulator.
+
+    Parameters
+    ----------
+    num_qubits : int
+        Number of qubits in the register.
+    lazy : bool, optional
+        When ``True`` gates are queued and fused (see :mod:`quantum.fusion`)
+        instead of being applied immediately.  The queue is flushed the
+        first time ``state`` is read, e.g. by ``probabilities()``,
+        ``measure*()`` or ``expectation()``.
+    precision : {"single", "double"} or dtype, optional
+        Precision of the state vector; the global default of
+        :mod:`quantum.precision` when omitted.
+    num_threads : int, optional
+        Worker threads the gate kernels split each gate over; the global
+        default of :mod:`quantum.parallel` when omitted.
+
+    Attributes
+    ----------
+    tracked : bool
+        ``True`` while ``operations`` alone determine the state from
+        ``|0...0>``.  Measurement collapses, assigning ``state`` and handing
+        out the writable ``state`` array clear it; result caches then have
+        to identify the circuit by its amplitudes.
+    """
 
-    def __init__(self, num_qubits: int):
+    def __init__(self, num_qubits: int, lazy: bool = False, precision=None, num_threads=None):
         self.num_qubits = num_qubits
-        self.state = np.zeros(2 ** num_qubits, dtype=complex)
+        self.lazy = lazy
+        self.dtype = resolve_dtype(precision)
+        self.num_threads = num_threads
+        self._pending = FusionQueue()
+        self._cdf_cache = {}
+        self.state = np.zeros(2 ** num_qubits, dtype=self.dtype)
         self.state[0] = 1
         # Track operations for potential compilation or analysis
         self.operations = []
+        self.tracked = True
+
+    @property
+    def state(self):
+        """State vector with all queued gates applied."""
+        # The caller may modify the returned array in place
+        self._cdf_cache.clear()
+        self.tracked = False
+        return self._flushed_state()
+
+    @state.setter
+    def state(self, value):
+        self._replace_state(value)
+        self.tracked = False
+
+    def _replace_state(self, value):
+        # A new state supersedes any gates still waiting in the queue
+        self._pending.clear()
+        self._cdf_cache.clear()
+        self._state = value
+
+    def statevector(self):
+        """Return a read-only view of the state with all queued gates applied."""
+        view = np.asarray(self._flushed_state()).view()
+        view.flags.writeable = False
+        return view
+
+    def _flushed_state(self):
+        """Return the state for reading without invalidating cached data."""
+        if len(self._pending):
+            self.flush()
+        return self._state
+
+    def flush(self):
+        """Apply all queued gates to the state vector."""
+        blocks = self._pending.drain()
+        if not blocks:
+            return
+        state = self._writable_state()
+        for matrix, qubits in blocks:
+            if len(qubits) == 1:
+                apply_1q_inplace(state, matrix, qubits[0], self.num_qubits,
+                                 num_threads=self.num_threads)
+            else:
+                apply_2q_inplace(state, matrix, qubits[0], qubits[1], self.num_qubits,
+                                 num_threads=self.num_threads)
+
+    def _writable_state(self):
+        """Return the state as a contiguous array the kernels may modify.
+
+        Callers are free to replace ``state`` with arbitrary arrays, so the
+        vector is converted back to a contiguous buffer of the circuit's
+        precision when needed.
+        """
+        if len(self._pending):
+            self.flush()
+        self._cdf_cache.clear()
+        state = self._state
+        if (
+            not isinstance(state, np.ndarray)
+            or state.dtype != self.dtype
+            or not state.flags.c_contiguous
+            or not state.flags.writeable
+        ):
+            state = self._state = np.array(state, dtype=self.dtype)
+        return state
 
     def apply_gate(self, gate, qubits):
         """Apply a gate to the specified qubits."""
-        for q in qubits:
-            self.state = apply_single_qubit_gate(self.state, gate, q, self.num_qubits)
-        self.operations.append(("gate", gate, list(qubits)))
+        if self.lazy:
+            for q in qubits:
+                self._pending.add(gate, (q,))
+        else:
+            state = self._writable_state()
+            for q in qubits:
+                apply_1q_inplace(state, gate, q, self.num_qubits, num_threads=self.num_threads)
+        self.operations.append(Instruction(GATE, qubits, gate))
 
     def apply_two_qubit_gate(self, gate, control, target):
         """Apply a two-qubit gate like CNOT.
@@ -50,15 +176,12 @@ class QuantumCircuit:
         """
         if control == target:
             raise ValueError("control and target must be different")
-        n = self.num_qubits
-        state = self.state.reshape([2] * n)
-        axes = [control, target] + [i for i in range(n) if i not in (control, target)]
-        state = np.transpose(state, axes)
-        state = (gate @ state.reshape(4, -1)).reshape([2, 2] + [2] * (n - 2))
-        inv_axes = np.argsort(axes)
-        state = np.transpose(state, inv_axes)
-        self.state = state.reshape(2 ** n)
-        self.operations.append(("two_qubit", gate, control, target))
+        if self.lazy:
+            self._pending.add(gate, (control, target))
+        else:
+            apply_2q_inplace(self._writable_state(), gate, control, target, self.num_qubits,
+                             num_threads=self.num_threads)
+        self.operations.append(Instruction(TWO_QUBIT, (control, target), gate))
 
     def apply_controlled_gate(self, gate, control, target):
         """Apply a controlled single-qubit gate.
@@ -72,23 +195,70 @@ class QuantumCircuit:
         target: int
             Index of the target qubit.
         """
-        n = self.num_qubits
-        cnot_like = np.array([[1, 0, 0, 0],
-                              [0, 1, 0, 0],
-                              [0, 0, gate[0, 0], gate[0, 1]],
-                              [0, 0, gate[1, 0], gate[1, 1]]], dtype=complex)
-        self.apply_two_qubit_gate(cnot_like, control, target)
-        self.operations.append(("controlled", gate, control, target))
+        if control == target:
+            raise ValueError("control and target must be different")
+        if self.lazy:
+            cnot_like = np.array([[1, 0, 0, 0],
+                                  [0, 1, 0, 0],
+                                  [0, 0, gate[0, 0], gate[0, 1]],
+                                  [0, 0, gate[1, 0], gate[1, 1]]], dtype=complex)
+            self._pending.add(cnot_like, (control, target))
+        else:
+            # Only the control = |1> half of the state is touched
+            apply_controlled_inplace(self._writable_state(), gate, control, target,
+                                     self.num_qubits, num_threads=self.num_threads)
+        self.operations.append(Instruction(CONTROLLED, (control, target), gate))
 
     def apply_unitary(self, unitary):
         """Apply a full unitary matrix to the state."""
-        self.state = unitary @ self.state
-        self.operations.append(("unitary", unitary))
+        matrix = np.asarray(unitary).astype(self.dtype, copy=False)
+        self._replace_state(matrix @ self._flushed_state())
+        self.operations.append(Instruction(UNITARY, (), unitary))
+
+    def _cumulative_distribution(self, qubits=None):
+        """Return the cached CDF over the full register or over ``qubits``."""
+        key = None if qubits is None else tuple(qubits)
+        if len(self._pending):
+            # Flushing queued gates also drops the distributions they invalidate
+            self.flush()
+        cdf = self._cdf_cache.get(key)
+        if cdf is None:
+            state = self._flushed_state()
+            if qubits is None:
+                probs = np.square(np.abs(state), dtype=np.float64)
+            else:
+                probs = marginal_probabilities(state, qubits, self.num_qubits)
+            cdf = self._cdf_cache[key] = cumulative_distribution(probs)
+        return cdf
+
+    def apply_phase_oracle(self, mask):
+        """Flip the sign of every amplitude whose index is marked in ``mask``.
+
+        ``mask`` is a boolean array over the ``2^n`` basis states, typically
+        produced once by evaluating an oracle on every index.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (2 ** self.num_qubits,):
+            raise ValueError("mask dimension mismatch")
+        state = self._writable_state()
+        np.negative(state, out=state, where=mask)
+        self.operations.append(Instruction(PHASE_ORACLE, (), mask))
+
+    def apply_diffusion(self):
+        """Reflect the state about the uniform superposition.
+
+        Applies ``2|psi0><psi0| - I`` as ``psi -> 2 <psi0|psi> psi0 - psi`` in
+        ``O(2^n)`` time instead of through a dense matrix.
+        """
+        state = self._writable_state()
+        mean = state.mean(dtype=complex)
+        np.negative(state, out=state)
+        state += 2 * mean
+        self.operations.append(Instruction(DIFFUSION))
 
     def measure(self):
         """Sample from the quantum state distribution."""
-        probabilities = np.abs(self.state) ** 2
-        return np.random.choice(len(probabilities), p=probabilities)
+        return int(sample_indices(self._cumulative_distribution(), 1)[0])
 
     def measure_all(self):
         """Return a bitstring measurement of the entire register."""
@@ -113,41 +283,73 @@ class QuantumCircuit:
         qubits = list(qubits)
         n_out = len(qubits)
 
-        # Build probability distribution for the specified qubits
-        probs = np.zeros(2 ** n_out, dtype=float)
-        for idx, amp in enumerate(self.state):
-            outcome = 0
-            for i, q in enumerate(qubits):
-                bit = (idx >> q) & 1
-                outcome |= bit << i
-            probs[outcome] += abs(amp) ** 2
-
-        outcome = np.random.choice(len(probs), p=probs)
-
-        # Collapse state to the observed outcome
-        mask = np.zeros_like(self.state, dtype=bool)
-        for idx in range(len(self.state)):
-            obs = 0
-            for i, q in enumerate(qubits):
-                bit = (idx >> q) & 1
-                obs |= bit << i
-            if obs == outcome:
-                mask[idx] = True
-        new_state = np.where(mask, self.state, 0)
-        norm = np.linalg.norm(new_state)
-        if norm != 0:
-            new_state /= norm
-        self.state = new_state
+        probs = self.marginal_probabilities(qubits)
+        outcome = np.random.choice(len(probs), p=probs / probs.sum())
+        collapse(self._writable_state(), qubits, outcome, self.num_qubits)
+        self.tracked = False
 
         bits = [(outcome >> i) & 1 for i in range(n_out)]
         return "".join(str(b) for b in bits)
 
+    def marginal_probabilities(self, qubits):
+        """Return the outcome distribution of measuring ``qubits``.
+
+        Entry ``k`` is the probability that ``qubits[i]`` reads bit ``i`` of
+        ``k``, using the same qubit convention as :meth:`measure_qubits`.
+        """
+        return marginal_probabilities(self._flushed_state(), qubits, self.num_qubits)
+
+    def sample(self, shots, qubits=None, seed=None, output="counts"):
+        """Draw ``shots`` measurement samples without collapsing the state.
+
+        Parameters
+        ----------
+        shots : int
+            Number of samples to draw.
+        qubits : iterable[int], optional
+            Qubits to sample, using the convention of :meth:`measure_qubits`.
+            The full register is sampled in :meth:`measure_all` order when
+            omitted.
+        seed : int or numpy.random.Generator, optional
+            Source of randomness.  The global NumPy random state is used
+            when ``None``.
+        output : {"counts", "bits"}
+            ``"counts"`` returns a ``{bitstring: count}`` histogram and
+            ``"bits"`` returns the samples as a ``(shots, ceil(width / 8))``
+            uint8 array packed with :func:`numpy.packbits`, one row per shot
+            in bitstring order.
+
+        The cumulative distribution is built once and reused by later calls
+        until the state changes.
+        """
+        if qubits is not None:
+            qubits = list(qubits)
+        cdf = self._cumulative_distribution(qubits)
+        rng = None if seed is None else np.random.default_rng(seed)
+        outcomes = sample_indices(cdf, shots, rng)
+        width = self.num_qubits if qubits is None else len(qubits)
+        msb_first = qubits is None
+
+        if output == "bits":
+            return np.packbits(outcome_bits(outcomes, width, msb_first), axis=1)
+        if output != "counts":
+            raise ValueError("output must be 'counts' or 'bits'")
+        values, counts = np.unique(outcomes, return_counts=True)
+        keys = format_bitstrings(values, width, msb_first)
+        return dict(zip(keys, counts.tolist()))
+
     def probabilities(self):
         """Return the probability of each computational basis state."""
-        return np.abs(self.state) ** 2
+        return np.square(np.abs(self._flushed_state()), dtype=np.float64)
 
-    def expectation(self, observable: np.ndarray) -> complex:
-        """Return expectation value of ``observable`` for the current state."""
+    def expectation(self, observable) -> complex:
+        """Return expectation value of ``observable`` for the current state.
+
+        ``observable`` is a dense matrix or a :class:`quantum.pauli.PauliSum`.
+        """
+        state = self._flushed_state()
+        if isinstance(observable, PauliSum):
+            return observable.expectation(state)
         if observable.shape != (2 ** self.num_qubits, 2 ** self.num_qubits):
             raise ValueError("observable dimension mismatch")
-        return self.state.conj() @ (observable @ self.state)
+        return np.vdot(state.astype(complex, copy=False), observable @ state)
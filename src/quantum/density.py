@@ -0,0 +1,197 @@
+"""Exact mixed-state simulation with a density-matrix backend.
+
+:class:`DensityMatrixCircuit` stores ``rho`` as a ``(2,) * 2n`` tensor whose
+first ``n`` axes index the ket and last ``n`` axes the bra.  Flattened, that
+tensor is a ``2n``-qubit vector, and ``U rho U^dagger`` is ``U`` on ket qubit
+``q`` followed by ``U*`` on bra qubit ``n + q``.  Gates are therefore applied
+with the same in-place axis kernels as :class:`quantum.QuantumCircuit`.
+A single-qubit Kraus channel becomes one local 4x4 map
+``sum_k K_k (x) K_k*`` on axes ``(q, n + q)``; no ``4^n x 4^n``
+superoperator is ever built.
+"""
+
+import numpy as np
+
+from .ir import Instruction, GATE, TWO_QUBIT, CONTROLLED, UNITARY, PHASE_ORACLE, DIFFUSION
+from .kernels import apply_1q_inplace, apply_2q_inplace, apply_controlled_inplace
+from .measurement import (
+    marginalize,
+    cumulative_distribution,
+    sample_indices,
+    format_bitstrings,
+)
+from .pauli import PauliSum
+
+
+class DensityMatrixCircuit:
+    """Density-matrix simulator with the gate API of ``QuantumCircuit``.
+
+    Parameters
+    ----------
+    num_qubits : int
+        Number of qubits in the register.
+    noise_model : NoiseModel, optional
+        Channel applied through its Kraus operators to every qubit touched
+        by each gate.
+    """
+
+    def __init__(self, num_qubits: int, noise_model=None):
+        self.num_qubits = num_qubits
+        self.noise_model = noise_model
+        self._data = np.zeros(4 ** num_qubits, dtype=complex)
+        self._data[0] = 1
+        self.operations = []
+
+    @classmethod
+    def from_state(cls, state, noise_model=None):
+        """Return the pure density matrix ``|state><state|``."""
+        state = np.asarray(state, dtype=complex)
+        num_qubits = int(np.log2(len(state)))
+        circuit = cls(num_qubits, noise_model)
+        circuit._data[...] = np.outer(state, state.conj()).reshape(-1)
+        return circuit
+
+    @property
+    def rho(self):
+        """Density matrix as a ``(2,) * 2n`` tensor view."""
+        return self._data.reshape((2,) * (2 * self.num_qubits))
+
+    def density_matrix(self):
+        """Density matrix as a ``(2^n, 2^n)`` view."""
+        dim = 2 ** self.num_qubits
+        return self._data.reshape(dim, dim)
+
+    def _noise(self, qubits):
+        if self.noise_model is not None:
+            self.apply_channel(self.noise_model.kraus_operators(), qubits)
+
+    def apply_channel(self, kraus, qubits=None):
+        """Apply the single-qubit channel with Kraus operators ``kraus``.
+
+        The channel acts independently on each of ``qubits`` (all qubits when
+        omitted).
+        """
+        n = self.num_qubits
+        superop = sum(np.kron(K, np.conj(K)) for K in np.asarray(kraus, dtype=complex))
+        for q in range(n) if qubits is None else qubits:
+            apply_2q_inplace(self._data, superop, q, n + q, 2 * n)
+
+    def apply_gate(self, gate, qubits):
+        """Apply a single-qubit gate to the specified qubits."""
+        n = self.num_qubits
+        gate = np.asarray(gate)
+        for q in qubits:
+            apply_1q_inplace(self._data, gate, q, 2 * n)
+            apply_1q_inplace(self._data, gate.conj(), n + q, 2 * n)
+        self.operations.append(Instruction(GATE, qubits, gate))
+        self._noise(qubits)
+
+    def apply_two_qubit_gate(self, gate, control, target):
+        """Apply a 4x4 gate to ``(control, target)``."""
+        if control == target:
+            raise ValueError("control and target must be different")
+        n = self.num_qubits
+        gate = np.asarray(gate)
+        apply_2q_inplace(self._data, gate, control, target, 2 * n)
+        apply_2q_inplace(self._data, gate.conj(), n + control, n + target, 2 * n)
+        self.operations.append(Instruction(TWO_QUBIT, (control, target), gate))
+        self._noise((control, target))
+
+    def apply_controlled_gate(self, gate, control, target):
+        """Apply a controlled single-qubit gate."""
+        if control == target:
+            raise ValueError("control and target must be different")
+        n = self.num_qubits
+        gate = np.asarray(gate)
+        apply_controlled_inplace(self._data, gate, control, target, 2 * n)
+        apply_controlled_inplace(self._data, gate.conj(), n + control, n + target, 2 * n)
+        self.operations.append(Instruction(CONTROLLED, (control, target), gate))
+        self._noise((control, target))
+
+    def apply_unitary(self, unitary):
+        """Apply a full unitary matrix as ``U rho U^dagger``."""
+        rho = self.density_matrix()
+        self._data[...] = (unitary @ rho @ unitary.conj().T).reshape(-1)
+        self.operations.append(Instruction(UNITARY, (), unitary))
+        self._noise(range(self.num_qubits))
+
+    def apply_phase_oracle(self, mask):
+        """Flip the sign of the basis states marked in ``mask``."""
+        mask = np.asarray(mask, dtype=bool)
+        signs = np.where(mask, -1.0, 1.0)
+        rho = self.density_matrix()
+        rho *= signs[:, None] * signs[None, :]
+        self.operations.append(Instruction(PHASE_ORACLE, (), mask))
+        self._noise(range(self.num_qubits))
+
+    def apply_diffusion(self):
+        """Reflect about the uniform superposition, ``D rho D`` with ``D = 2|s><s| - I``."""
+        rho = self.density_matrix()
+        col_mean = rho.mean(axis=1, keepdims=True)
+        row_mean = rho.mean(axis=0, keepdims=True)
+        total = rho.mean()
+        # D rho D = rho - 2 |s><s| rho - 2 rho |s><s| + 4 <s|rho|s> |s><s|
+        rho -= 2 * row_mean
+        rho -= 2 * col_mean
+        rho += 4 * total
+        self.operations.append(Instruction(DIFFUSION))
+        self._noise(range(self.num_qubits))
+
+    def probabilities(self):
+        """Return the probability of each computational basis state."""
+        return np.real(np.diagonal(self.density_matrix())).copy()
+
+    def marginal_probabilities(self, qubits):
+        """Return the outcome distribution of measuring ``qubits``.
+
+        Uses the qubit convention of :meth:`QuantumCircuit.measure_qubits`.
+        """
+        return marginalize(self.probabilities(), qubits, self.num_qubits)
+
+    def expectation(self, observable) -> complex:
+        """Return ``Tr(observable rho)`` for a dense matrix or ``PauliSum``."""
+        rho = self.density_matrix()
+        if isinstance(observable, PauliSum):
+            # Rows of rho.T are columns of rho, so this yields (H rho)^T
+            return np.trace(observable.apply(rho.T))
+        if observable.shape != rho.shape:
+            raise ValueError("observable dimension mismatch")
+        return np.einsum("ij,ji->", observable, rho)
+
+    def fidelity(self, state) -> float:
+        """Return ``<state|rho|state>`` for a pure reference ``state``."""
+        state = np.asarray(state, dtype=complex)
+        return float(np.real(state.conj() @ self.density_matrix() @ state))
+
+    def purity(self) -> float:
+        """Return ``Tr(rho^2)``."""
+        return float(np.real(np.vdot(self._data, self._data)))
+
+    def sample(self, shots, seed=None):
+        """Return a ``{bitstring: count}`` histogram over the full register."""
+        rng = np.random.default_rng(seed) if seed is not None else None
+        cdf = cumulative_distribution(self.probabilities())
+        values, counts = np.unique(sample_indices(cdf, shots, rng), return_counts=True)
+        return dict(zip(format_bitstrings(values, self.num_qubits), counts.tolist()))
+
+    def measure_all(self):
+        """Return a bitstring measurement of the entire register."""
+        return next(iter(self.sample(1)))
+
+    def measure_qubits(self, qubits):
+        """Measure ``qubits``, project ``rho`` and return the outcome bitstring.
+
+        Follows the conventions of :meth:`QuantumCircuit.measure_qubits`.
+        """
+        qubits = list(qubits)
+        n = self.num_qubits
+        probs = self.marginal_probabilities(qubits)
+        outcome = np.random.choice(len(probs), p=probs / probs.sum())
+        rho = self.rho
+        for i, q in enumerate(qubits):
+            reject = 1 - ((outcome >> i) & 1)
+            # Bit ``q`` of a basis index is ket axis ``n - 1 - q``
+            rho[(slice(None),) * (n - 1 - q) + (reject,)] = 0
+            rho[(slice(None),) * (2 * n - 1 - q) + (reject,)] = 0
+        self._data /= np.trace(self.density_matrix())
+        return "".join(str((outcome >> i) & 1) for i in range(len(qubits)))
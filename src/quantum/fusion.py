@@ -0,0 +1,109 @@
+"""Gate fusion for deferred circuit execution.
+
+Gates pushed onto a :class:`FusionQueue` are merged into as few one- and
+two-qubit blocks as possible before they touch the state vector:
+
+* consecutive single-qubit gates on the same qubit collapse into one 2x2;
+* single-qubit gates adjacent to a two-qubit block on an overlapping qubit
+  are folded into that block's 4x4;
+* consecutive two-qubit gates on the same pair multiply into one 4x4.
+
+A gate is only merged into the most recent block touching its qubits, so
+every block it moves past acts on disjoint qubits and commutes with it.
+"""
+
+import numpy as np
+
+_I2 = np.eye(2, dtype=complex)
+_SWAP = np.array([[1, 0, 0, 0],
+                  [0, 0, 1, 0],
+                  [0, 1, 0, 0],
+                  [0, 0, 0, 1]], dtype=complex)
+
+
+class _Block:
+    def __init__(self, matrix, qubits):
+        self.matrix = matrix
+        self.qubits = qubits
+        self.alive = True
+
+
+def _lift(gate, qubit, qubits):
+    """Express the single-qubit ``gate`` on ``qubit`` in the space of ``qubits``."""
+    if len(qubits) == 1:
+        return gate
+    if qubits[0] == qubit:
+        return np.kron(gate, _I2)
+    return np.kron(_I2, gate)
+
+
+def _orient(gate, qubits, target_qubits):
+    """Reorder a 4x4 ``gate`` acting on ``qubits`` to act on ``target_qubits``."""
+    if tuple(qubits) == tuple(target_qubits):
+        return gate
+    return _SWAP @ gate @ _SWAP
+
+
+class FusionQueue:
+    """Queue of pending gates merged into fused blocks on insertion."""
+
+    def __init__(self):
+        self._blocks = []
+        self._last = {}
+        self.gates_added = 0
+
+    def __len__(self):
+        return sum(1 for b in self._blocks if b.alive)
+
+    def add(self, gate, qubits):
+        """Queue ``gate`` acting on one or two ``qubits``."""
+        gate = np.asarray(gate, dtype=complex)
+        self.gates_added += 1
+        if len(qubits) == 1:
+            self._add_single(gate, qubits[0])
+        elif len(qubits) == 2:
+            self._add_pair(gate, qubits[0], qubits[1])
+        else:
+            raise ValueError("only one- and two-qubit gates can be fused")
+
+    def _append(self, matrix, qubits):
+        block = _Block(matrix, qubits)
+        self._blocks.append(block)
+        for q in qubits:
+            self._last[q] = block
+        return block
+
+    def _add_single(self, gate, qubit):
+        block = self._last.get(qubit)
+        if block is None:
+            self._append(gate, (qubit,))
+        else:
+            block.matrix = _lift(gate, qubit, block.qubits) @ block.matrix
+
+    def _add_pair(self, gate, first, second):
+        if first == second:
+            raise ValueError("control and target must be different")
+        qubits = (first, second)
+        prev_first, prev_second = self._last.get(first), self._last.get(second)
+        if prev_first is not None and prev_first is prev_second:
+            prev_first.matrix = _orient(gate, qubits, prev_first.qubits) @ prev_first.matrix
+            return
+
+        matrix = gate
+        for block, qubit in ((prev_first, first), (prev_second, second)):
+            if block is not None and len(block.qubits) == 1:
+                matrix = matrix @ _lift(block.matrix, qubit, qubits)
+                block.alive = False
+        self._append(matrix, qubits)
+
+    def drain(self):
+        """Return the fused ``(matrix, qubits)`` blocks and reset the queue."""
+        fused = [(b.matrix, b.qubits) for b in self._blocks if b.alive]
+        self._blocks = []
+        self._last = {}
+        self.gates_added = 0
+        return fused
+
+    def clear(self):
+        """Discard all pending gates."""
+        self.drain()
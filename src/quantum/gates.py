@@ -2,6 +2,8 @@
 
 import numpy as np
 
+from .precision import resolve_dtype
+
 CNOT = np.array([[1, 0, 0, 0],
                  [0, 1, 0, 0],
                  [0, 0, 0, 1],
@@ -14,9 +16,52 @@ S = np.array([[1, 0], [0, 1j]], dtype=complex)
 T = np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex)
 
 
-def RZ(theta: float) -> np.ndarray:
-    """Return a rotation about the Z axis by ``theta`` radians."""
-    return np.array(
-        [[np.exp(-1j * theta / 2), 0], [0, np.exp(1j * theta / 2)]], dtype=complex
-    )
+def RZ(theta, precision=None) -> np.ndarray:
+    """Return a rotation about the Z axis by ``theta`` radians.
+
+    ``theta`` may also be an array of angles, in which case a stack of
+    matrices with shape ``theta.shape + (2, 2)`` is returned.  ``precision``
+    selects the dtype as in :func:`quantum.precision.resolve_dtype`.
+    """
+    dtype = resolve_dtype(precision)
+    if np.ndim(theta) == 0:
+        return np.array(
+            [[np.exp(-1j * theta / 2), 0], [0, np.exp(1j * theta / 2)]], dtype=dtype
+        )
+    theta = np.asarray(theta, dtype=float)
+    out = np.zeros(theta.shape + (2, 2), dtype=dtype)
+    out[..., 0, 0] = np.exp(-1j * theta / 2)
+    out[..., 1, 1] = np.exp(1j * theta / 2)
+    return out
+
+
+def rotation(generator, theta, precision=None) -> np.ndarray:
+    """Return ``exp(-i theta G / 2)`` for a Pauli ``generator`` ``G``.
+
+    ``rotation(Z, theta)`` equals :func:`RZ`.  An array of angles yields a
+    stack of matrices with shape ``theta.shape + (2, 2)``.
+    """
+    theta = np.asarray(theta, dtype=float)[..., None, None]
+    matrix = np.cos(theta / 2) * I - 1j * np.sin(theta / 2) * np.asarray(generator)
+    return matrix.astype(resolve_dtype(precision), copy=False)
+
+
+DIAGONAL = "diagonal"
+PERMUTATION = "permutation"
+DENSE = "dense"
+
+
+def classify(gate, atol: float = 1e-12) -> str:
+    """Return the structural class of ``gate``.
 
+    ``"diagonal"`` gates only rescale amplitudes, ``"permutation"`` gates
+    have exactly one non-zero entry per row and column (a permutation with
+    phases, such as ``X`` or ``CNOT``) and everything else is ``"dense"``.
+    """
+    gate = np.asarray(gate)
+    nonzero = np.abs(gate) > atol
+    if not np.any(nonzero & ~np.eye(len(gate), dtype=bool)):
+        return DIAGONAL
+    if np.all(nonzero.sum(axis=0) == 1) and np.all(nonzero.sum(axis=1) == 1):
+        return PERMUTATION
+    return DENSE
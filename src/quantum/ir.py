@@ -0,0 +1,337 @@
+"""Compact instruction records for ``QuantumCircuit.operations``.
+
+Each recorded operation is an :class:`Instruction` holding an opcode, a
+tuple of qubit indices, a tuple of float parameters and a reference into the
+shared :data:`GATES` table instead of its own copy of the matrix:
+
+* named constants (``H``, ``X``, ``CNOT`` ...) are recognized by content;
+* rotations ``RX``, ``RY``, ``RZ`` and the phase gate ``P`` are stored as a
+  family name plus their angle and rebuilt on demand;
+* any other small matrix is interned once and referenced by id.
+
+Full-register unitaries, phase-oracle masks and per-row gate stacks of
+:class:`quantum.BatchedCircuit` are kept by reference in ``data``.
+
+For backwards compatibility an instruction also behaves like the tuples the
+log used to hold, e.g. ``("gate", matrix, [qubits])``, so ``op[0]`` and
+tuple unpacking keep working.
+"""
+
+import cmath
+import hashlib
+import math
+import threading
+
+import numpy as np
+
+from .gates import CNOT, H, X, Z, I, S, T
+
+GATE = "gate"
+TWO_QUBIT = "two_qubit"
+CONTROLLED = "controlled"
+UNITARY = "unitary"
+PHASE_ORACLE = "phase_oracle"
+DIFFUSION = "diffusion"
+OPCODES = (GATE, TWO_QUBIT, CONTROLLED, UNITARY, PHASE_ORACLE, DIFFUSION)
+
+# Matrices that rebuild from their angle within this tolerance use the family
+_FAMILY_ATOL = 1e-14
+_FAMILY_ATOL_SINGLE = 1e-6
+
+
+def _rx(theta):
+    c, s = math.cos(theta / 2), math.sin(theta / 2)
+    return np.array([[c, -1j * s], [-1j * s, c]], dtype=complex)
+
+
+def _ry(theta):
+    c, s = math.cos(theta / 2), math.sin(theta / 2)
+    return np.array([[c, -s], [s, c]], dtype=complex)
+
+
+def _rz(theta):
+    return np.array([[cmath.exp(-0.5j * theta), 0], [0, cmath.exp(0.5j * theta)]], dtype=complex)
+
+
+def _phase(phi):
+    return np.array([[1, 0], [0, cmath.exp(1j * phi)]], dtype=complex)
+
+
+FAMILIES = {"RX": _rx, "RY": _ry, "RZ": _rz, "P": _phase}
+
+
+def _match_family(a, b, c, d, atol=_FAMILY_ATOL):
+    """Return ``(family, angle)`` for a 2x2 rotation ``[[a, b], [c, d]]``."""
+    def close(x, y):
+        return abs(x - y) <= atol
+
+    if close(b, 0) and close(c, 0):
+        if close(a, 1):
+            return "P", cmath.phase(d)
+        if close(a, d.conjugate()) and close(abs(d), 1):
+            return "RZ", 2 * cmath.phase(d)
+        return None
+    if close(a, d) and close(a.imag, 0) and close(b, c) and close(b.real, 0):
+        return "RX", 2 * math.atan2(-b.imag, a.real)
+    if close(a, d) and close(a.imag, 0) and close(b, -c) and close(b.imag, 0):
+        return "RY", 2 * math.atan2(c.real, a.real)
+    return None
+
+
+class GateTable:
+    """Shared intern table mapping gate matrices to small integer ids.
+
+    Parameters
+    ----------
+    max_entries : int
+        Bound on interned anonymous matrices; beyond it new matrices are kept
+        inline by the instructions that use them.
+    """
+
+    def __init__(self, max_entries: int = 1 << 16):
+        self.max_entries = max_entries
+        self._matrices = []
+        self._names = []
+        self._payloads = []
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._matrices)
+
+    def _key(self, matrix):
+        return matrix.shape, matrix.tobytes()
+
+    def intern(self, matrix, name=None):
+        """Return the id of ``matrix``, adding it to the table if needed.
+
+        Returns ``None`` when the table is full and ``matrix`` is new.
+        """
+        matrix = np.ascontiguousarray(matrix, dtype=complex)
+        key = self._key(matrix)
+        gate_id = self._index.get(key)
+        if gate_id is not None:
+            return gate_id
+        with self._lock:
+            gate_id = self._index.get(key)
+            if gate_id is None:
+                if name is None and len(self._matrices) >= self.max_entries:
+                    return None
+                gate_id = len(self._matrices)
+                matrix = matrix.copy()
+                matrix.setflags(write=False)
+                self._matrices.append(matrix)
+                self._names.append(name)
+                # One shared object per gate so pickling sends each matrix once
+                self._payloads.append((name, matrix.shape, key[1]))
+                self._index[key] = gate_id
+        return gate_id
+
+    def lookup(self, matrix):
+        """Return the id of ``matrix`` without interning it, or ``None``."""
+        matrix = np.ascontiguousarray(matrix, dtype=complex)
+        return self._index.get(self._key(matrix))
+
+    def matrix(self, gate_id):
+        """Return the read-only matrix stored under ``gate_id``."""
+        return self._matrices[gate_id]
+
+    def name(self, gate_id):
+        """Return the name of ``gate_id``, or ``None`` for anonymous matrices."""
+        return self._names[gate_id]
+
+    def payload(self, gate_id):
+        """Return the picklable ``(name, shape, bytes)`` record of ``gate_id``."""
+        return self._payloads[gate_id]
+
+    def restore(self, payload):
+        """Intern a matrix from a :meth:`payload` record and return its id."""
+        name, shape, raw = payload
+        return self.intern(np.frombuffer(raw, dtype=complex).reshape(shape), name)
+
+
+GATES = GateTable()
+for _name, _matrix in (("I", I), ("H", H), ("X", X), ("Z", Z), ("S", S), ("T", T),
+                       ("CNOT", CNOT)):
+    GATES.intern(_matrix, _name)
+GATES.intern(np.array([[0, -1j], [1j, 0]]), "Y")
+
+
+def gate_name(matrix) -> str:
+    """Return a display name for ``matrix`` such as ``"H"`` or ``"RZ"``."""
+    matrix = np.asarray(matrix)
+    gate_id = GATES.lookup(matrix)
+    if gate_id is not None and GATES.name(gate_id) is not None:
+        return GATES.name(gate_id)
+    if matrix.shape == (2, 2):
+        family = _match_family(*(complex(v) for v in matrix.ravel()))
+        if family is not None:
+            return family[0]
+    return "U"
+
+
+class Instruction:
+    """One recorded circuit operation.
+
+    Parameters
+    ----------
+    opcode : str
+        One of :data:`OPCODES`.
+    qubits : iterable[int]
+        Qubits acted on; ``(control, target)`` for two-qubit opcodes.
+    matrix : np.ndarray, optional
+        Gate matrix, full unitary, oracle mask or per-row gate stack.
+    """
+
+    __slots__ = ("opcode", "qubits", "params", "gate", "data", "_digest")
+
+    def __init__(self, opcode, qubits=(), matrix=None):
+        if opcode not in OPCODES:
+            raise ValueError(f"unknown operation {opcode!r}")
+        self.opcode = opcode
+        self.qubits = tuple(int(q) for q in qubits)
+        self.params = ()
+        self.gate = None
+        self.data = None
+        self._digest = None
+        if matrix is None:
+            return
+        if opcode in (UNITARY, PHASE_ORACLE) or np.ndim(matrix) != 2:
+            self.data = matrix
+            return
+        matrix = np.asarray(matrix)
+        gate_id = GATES.lookup(matrix)
+        if gate_id is None and matrix.shape == (2, 2):
+            atol = _FAMILY_ATOL_SINGLE if matrix.dtype == np.complex64 else _FAMILY_ATOL
+            family = _match_family(*(complex(v) for v in matrix.ravel()), atol=atol)
+            if family is not None:
+                rebuilt = FAMILIES[family[0]](family[1])
+                if np.allclose(rebuilt, matrix, rtol=0, atol=atol):
+                    self.gate, self.params = family[0], (float(family[1]),)
+                    return
+        if gate_id is None:
+            gate_id = GATES.intern(matrix)
+        if gate_id is None:
+            self.data = matrix
+        else:
+            self.gate = gate_id
+
+    @classmethod
+    def from_tuple(cls, op):
+        """Build an instruction from a legacy ``operations`` tuple."""
+        if isinstance(op, cls):
+            return op
+        kind = op[0]
+        if kind == GATE:
+            return cls(kind, op[2], op[1])
+        if kind in (TWO_QUBIT, CONTROLLED):
+            return cls(kind, (op[2], op[3]), op[1])
+        if kind in (UNITARY, PHASE_ORACLE):
+            return cls(kind, (), op[1])
+        return cls(kind)
+
+    @property
+    def name(self) -> str:
+        """Gate name, e.g. ``"H"``, ``"RZ"`` or ``"U7"``; the opcode otherwise."""
+        if isinstance(self.gate, str):
+            return self.gate
+        if self.gate is not None:
+            return GATES.name(self.gate) or f"U{self.gate}"
+        if self.opcode in (GATE, TWO_QUBIT, CONTROLLED):
+            return "U"
+        return self.opcode
+
+    @property
+    def matrix(self):
+        """Matrix, mask or gate stack of the instruction (``None`` if it has none)."""
+        if self.data is not None:
+            return self.data
+        if isinstance(self.gate, str):
+            return FAMILIES[self.gate](*self.params)
+        if self.gate is not None:
+            return GATES.matrix(self.gate)
+        return None
+
+    def as_tuple(self):
+        """Return the legacy ``operations`` tuple for this instruction."""
+        if self.opcode == GATE:
+            return (GATE, self.matrix, list(self.qubits))
+        if self.opcode in (TWO_QUBIT, CONTROLLED):
+            return (self.opcode, self.matrix) + self.qubits
+        if self.opcode in (UNITARY, PHASE_ORACLE):
+            return (self.opcode, self.data)
+        return (self.opcode,)
+
+    def __getitem__(self, index):
+        return self.as_tuple()[index]
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __len__(self):
+        return len(self.as_tuple())
+
+    def __repr__(self):
+        params = f", params={self.params}" if self.params else ""
+        return f"Instruction({self.opcode!r}, {self.name}, qubits={self.qubits}{params})"
+
+    def apply(self, target):
+        """Apply the instruction to ``target``, any backend with the circuit API."""
+        if self.opcode == GATE:
+            target.apply_gate(self.matrix, self.qubits)
+        elif self.opcode == TWO_QUBIT:
+            target.apply_two_qubit_gate(self.matrix, *self.qubits)
+        elif self.opcode == CONTROLLED:
+            target.apply_controlled_gate(self.matrix, *self.qubits)
+        elif self.opcode == UNITARY:
+            target.apply_unitary(self.data)
+        elif self.opcode == PHASE_ORACLE:
+            target.apply_phase_oracle(self.data)
+        else:
+            target.apply_diffusion()
+
+    def digest(self) -> bytes:
+        """Return a content digest that is stable across processes."""
+        if self._digest is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(f"{self.opcode}{self.qubits}{self.params}".encode())
+            if isinstance(self.gate, str):
+                h.update(self.gate.encode())
+            elif self.gate is not None:
+                h.update(GATES.payload(self.gate)[2])
+            elif self.data is not None:
+                data = np.ascontiguousarray(self.data)
+                h.update(f"{data.dtype.str}{data.shape}".encode())
+                h.update(data.tobytes())
+            self._digest = h.digest()
+        return self._digest
+
+    def __hash__(self):
+        return hash(self.digest())
+
+    def __eq__(self, other):
+        if not isinstance(other, Instruction):
+            return NotImplemented
+        return self.digest() == other.digest()
+
+    def __reduce__(self):
+        gate = self.gate
+        if gate is not None and not isinstance(gate, str):
+            gate = GATES.payload(gate)
+        return _restore, (self.opcode, self.qubits, self.params, gate, self.data)
+
+
+def _restore(opcode, qubits, params, gate, data):
+    inst = Instruction.__new__(Instruction)
+    inst.opcode = opcode
+    inst.qubits = qubits
+    inst.params = params
+    inst.gate = gate
+    inst.data = data
+    if gate is not None and not isinstance(gate, str):
+        inst.gate = GATES.restore(gate)
+        if inst.gate is None:
+            # The receiving table is full; keep the matrix inline
+            inst.data = np.frombuffer(gate[2], dtype=complex).reshape(gate[1])
+    inst._digest = None
+    return inst
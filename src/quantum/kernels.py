@@ -0,0 +1,206 @@
+"""In-place state-vector kernels for one- and two-qubit gates.
+
+The kernels address the amplitudes touched by a gate through strided views
+of the state vector instead of transposing and copying it.  Intermediate
+results are written into scratch buffers that are allocated once and reused
+for every subsequent gate, so applying a gate performs no full-size
+allocation.  Diagonal gates (``Z``, ``S``, ``T``, ``RZ``, controlled phases)
+only rescale slices of the state and permutation gates (``X``, ``CNOT``)
+only move slices, so both skip the dense multiply entirely.
+
+Qubit ``q`` corresponds to axis ``q`` of the state reshaped to ``[2] * n``,
+matching :func:`quantum.circuit.apply_single_qubit_gate`.
+
+With ``num_threads`` above one the amplitude views of a gate are cut into
+independent blocks that :mod:`quantum.parallel` updates concurrently, each
+worker thread using its own workspace.
+"""
+
+import threading
+
+import numpy as np
+
+from .gates import classify, DIAGONAL, PERMUTATION
+from .parallel import resolve_threads, partition, run_blocks
+
+
+class KernelWorkspace:
+    """Grow-only pool of scratch memory shared by the in-place kernels."""
+
+    def __init__(self):
+        self._buffer = np.empty(0, dtype=complex)
+
+    def scratch(self, size, dtype=complex):
+        """Return a flat scratch array with at least ``size`` elements."""
+        dtype = np.dtype(dtype)
+        if self._buffer.dtype != dtype or self._buffer.size < size:
+            self._buffer = np.empty(size, dtype=dtype)
+        return self._buffer[:size]
+
+    def release(self):
+        """Drop the scratch memory held by the workspace."""
+        self._buffer = np.empty(0, dtype=complex)
+
+
+_local = threading.local()
+
+
+def default_workspace() -> KernelWorkspace:
+    """Return the workspace owned by the calling thread."""
+    workspace = getattr(_local, "workspace", None)
+    if workspace is None:
+        workspace = _local.workspace = KernelWorkspace()
+    return workspace
+
+
+def scratch_blocks(scratch, count, shape):
+    """Split a flat ``scratch`` buffer into ``count`` arrays of ``shape``."""
+    size = int(np.prod(shape))
+    return [scratch[i * size:(i + 1) * size].reshape(shape) for i in range(count)]
+
+
+def single_qubit_views(state, qubit, n):
+    """Return views of the amplitudes where ``qubit`` is ``0`` and ``1``.
+
+    Leading axes of ``state`` beyond the last (for example a batch axis) are
+    preserved in the returned views.
+    """
+    lead = state.shape[:-1]
+    view = state.reshape(lead + (2 ** qubit, 2, 2 ** (n - qubit - 1)))
+    return view[..., 0, :], view[..., 1, :]
+
+
+def two_qubit_views(state, first, second, n):
+    """Return the four amplitude views of a two-qubit subspace.
+
+    The views are ordered by the basis index ``2 * b_first + b_second`` used
+    for 4x4 gate matrices.
+    """
+    low, high = sorted((first, second))
+    lead = state.shape[:-1]
+    view = state.reshape(
+        lead + (2 ** low, 2, 2 ** (high - low - 1), 2, 2 ** (n - high - 1))
+    )
+    views = []
+    for b_first in (0, 1):
+        for b_second in (0, 1):
+            if first < second:
+                views.append(view[..., b_first, :, b_second, :])
+            else:
+                views.append(view[..., b_second, :, b_first, :])
+    return views
+
+
+def _apply_pair(a0, a1, gate, workspace, kind=None):
+    """Apply the 2x2 ``gate`` to the amplitude pair ``(a0, a1)`` in place."""
+    kind = kind or classify(gate)
+    g00, g01, g10, g11 = (complex(g) for g in np.asarray(gate).ravel())
+    if kind == DIAGONAL:
+        if g00 != 1:
+            a0 *= g00
+        if g11 != 1:
+            a1 *= g11
+        return
+    s0, s1 = scratch_blocks(workspace.scratch(2 * a0.size, a0.dtype), 2, a0.shape)
+    if kind == PERMUTATION:
+        s0[...] = a0
+        np.multiply(a1, g01, out=a0)
+        np.multiply(s0, g10, out=a1)
+        return
+
+    np.multiply(a0, g00, out=s0)
+    np.multiply(a1, g01, out=s1)
+    s0 += s1
+    np.multiply(a0, g10, out=s1)
+    a1 *= g11
+    a1 += s1
+    a0[...] = s0
+
+
+def _apply_quad(views, gate, workspace, kind):
+    """Apply the 4x4 ``gate`` to the four amplitude ``views`` in place."""
+    gate = np.asarray(gate)
+    if kind == DIAGONAL:
+        for k in range(4):
+            phase = complex(gate[k, k])
+            if phase != 1:
+                views[k] *= phase
+        return
+
+    shape, size, dtype = views[0].shape, views[0].size, views[0].dtype
+    if kind == PERMUTATION:
+        sources = np.argmax(np.abs(gate), axis=1)
+        moved = [k for k in range(4) if sources[k] != k]
+        scratch = workspace.scratch(4 * size, dtype)
+        saved = dict(zip(moved, scratch_blocks(scratch, len(moved), shape)))
+        for k in moved:
+            saved[k][...] = views[sources[k]]
+        for k in range(4):
+            coeff = complex(gate[k, sources[k]])
+            if k in saved:
+                np.multiply(saved[k], coeff, out=views[k])
+            elif coeff != 1:
+                views[k] *= coeff
+        return
+
+    scratch = workspace.scratch(5 * size, dtype)
+    out = scratch_blocks(scratch, 5, shape)
+    tmp = out.pop()
+    for k in range(4):
+        np.multiply(views[0], complex(gate[k, 0]), out=out[k])
+        for j in range(1, 4):
+            coeff = complex(gate[k, j])
+            if coeff == 0:
+                continue
+            np.multiply(views[j], coeff, out=tmp)
+            out[k] += tmp
+    for k in range(4):
+        views[k][...] = out[k]
+
+
+def _run(apply, views, gate, workspace, kind, num_threads):
+    """Run ``apply(views, gate, workspace, kind)``, split over worker threads."""
+    blocks = partition(views[0].shape, resolve_threads(num_threads))
+    if not blocks:
+        apply(views, gate, workspace or default_workspace(), kind)
+        return
+    # Workers ignore ``workspace`` and use the scratch memory of their thread
+    run_blocks(lambda block: apply([v[block] for v in views], gate, default_workspace(), kind),
+               blocks)
+
+
+def _pair(views, gate, workspace, kind):
+    _apply_pair(views[0], views[1], gate, workspace, kind)
+
+
+def apply_1q_inplace(state, gate, qubit, n, workspace=None, kind=None, num_threads=None):
+    """Apply the 2x2 ``gate`` to ``qubit`` of ``state`` in place.
+
+    ``kind`` is the result of :func:`quantum.gates.classify` and is computed
+    from ``gate`` when omitted.  ``num_threads`` defaults to
+    :func:`quantum.parallel.get_num_threads`.
+    """
+    kind = kind or classify(gate)
+    _run(_pair, single_qubit_views(state, qubit, n), gate, workspace, kind, num_threads)
+    return state
+
+
+def apply_2q_inplace(state, gate, first, second, n, workspace=None, kind=None, num_threads=None):
+    """Apply the 4x4 ``gate`` to qubits ``(first, second)`` in place."""
+    if first == second:
+        raise ValueError("control and target must be different")
+    kind = kind or classify(gate)
+    _run(_apply_quad, two_qubit_views(state, first, second, n), gate, workspace, kind,
+         num_threads)
+    return state
+
+
+def apply_controlled_inplace(state, gate, control, target, n, workspace=None, kind=None,
+                             num_threads=None):
+    """Apply the 2x2 ``gate`` to ``target`` on the ``control = 1`` subspace."""
+    if control == target:
+        raise ValueError("control and target must be different")
+    kind = kind or classify(gate)
+    views = two_qubit_views(state, control, target, n)
+    _run(_pair, views[2:], gate, workspace, kind, num_threads)
+    return state
@@ -0,0 +1,98 @@
+"""Vectorized marginal probabilities and state collapse.
+
+Measurement routines follow the convention of
+:meth:`quantum.QuantumCircuit.measure_qubits`: qubit ``q`` is bit ``q`` of
+the computational basis index, and outcome bit ``i`` of a marginal
+distribution holds the value of ``qubits[i]``.
+"""
+
+import numpy as np
+
+
+def _axes(qubits, n):
+    qubits = list(qubits)
+    if len(set(qubits)) != len(qubits):
+        raise ValueError("qubits must be distinct")
+    for q in qubits:
+        if not 0 <= q < n:
+            raise ValueError(f"qubit {q} out of range for {n} qubits")
+    # Bit ``q`` of the index is axis ``n - 1 - q`` of the [2] * n tensor
+    return [n - 1 - q for q in qubits]
+
+
+def marginal_probabilities(state, qubits, n):
+    """Return the outcome distribution of measuring ``qubits`` of ``state``.
+
+    The probabilities are summed over the remaining qubits by reshaping the
+    state to ``[2] * n`` and reducing the other axes, so no per-amplitude
+    Python work is done.
+    """
+    return marginalize(np.square(np.abs(state), dtype=np.float64), qubits, n)
+
+
+def marginalize(probs, qubits, n):
+    """Return the marginal of the basis-state distribution ``probs`` over ``qubits``."""
+    axes = _axes(qubits, n)
+    probs = np.asarray(probs).reshape([2] * n)
+    others = tuple(ax for ax in range(n) if ax not in axes)
+    marginal = probs.sum(axis=others) if others else probs
+    # ``marginal`` keeps the measured axes in increasing order; reorder them so
+    # that ``qubits[0]`` becomes the least significant outcome bit.
+    kept = sorted(axes)
+    order = [kept.index(ax) for ax in reversed(axes)]
+    return np.transpose(marginal, order).reshape(2 ** len(axes))
+
+
+def collapse(state, qubits, outcome, n):
+    """Project ``state`` onto ``outcome`` of ``qubits`` in place and renormalize."""
+    axes = _axes(qubits, n)
+    tensor = state.reshape([2] * n)
+    for i, ax in enumerate(axes):
+        bit = (outcome >> i) & 1
+        index = (slice(None),) * ax + (1 - bit,)
+        tensor[index] = 0
+    # Accumulate in float64 even for single-precision states
+    norm = np.sqrt(np.sum(np.square(np.abs(state), dtype=np.float64)))
+    if norm != 0:
+        state /= norm
+    return state
+
+
+def cumulative_distribution(probs):
+    """Return the running sum of ``probs`` accumulated in float64."""
+    return np.cumsum(np.asarray(probs, dtype=np.float64))
+
+
+def sample_indices(cdf, shots, rng=None):
+    """Draw ``shots`` outcome indices from the cumulative distribution ``cdf``.
+
+    ``rng`` is a :class:`numpy.random.Generator`; the global NumPy random
+    state is used when it is ``None`` so ``np.random.seed`` keeps working.
+    """
+    uniform = rng.random(shots) if rng is not None else np.random.random_sample(shots)
+    indices = np.searchsorted(cdf, uniform * cdf[-1], side="right")
+    # Guard against round-off pushing a draw past the final bin
+    return np.minimum(indices, len(cdf) - 1)
+
+
+def outcome_bits(outcomes, width, msb_first=True):
+    """Return a ``(len(outcomes), width)`` uint8 matrix of outcome bits.
+
+    With ``msb_first`` column ``j`` holds bit ``width - 1 - j`` (the order of
+    :meth:`quantum.QuantumCircuit.measure_all`); otherwise column ``j`` holds
+    bit ``j`` (the order of ``measure_qubits``).
+    """
+    shifts = np.arange(width)
+    if msb_first:
+        shifts = shifts[::-1]
+    outcomes = np.asarray(outcomes, dtype=np.int64)
+    return ((outcomes[:, None] >> shifts) & 1).astype(np.uint8)
+
+
+def format_bitstrings(outcomes, width, msb_first=True):
+    """Format integer ``outcomes`` as bitstrings in a single vectorized pass."""
+    outcomes = np.asarray(outcomes)
+    if width == 0:
+        return [""] * len(outcomes)
+    chars = outcome_bits(outcomes, width, msb_first) + ord("0")
+    return chars.view(f"S{width}").ravel().astype(str).tolist()
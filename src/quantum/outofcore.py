@@ -0,0 +1,298 @@
+"""Out-of-core state-vector simulation backed by ``np.memmap``.
+
+:class:`MemmapCircuit` keeps the ``2^n`` amplitudes in a file on disk and only
+ever holds a few contiguous chunks of ``2^b`` amplitudes in RAM, with ``b``
+chosen from a memory budget.  Qubit ``q`` follows the axis convention of
+:class:`quantum.QuantumCircuit`, so the last ``b`` qubits index amplitudes
+inside a chunk ("in-block") and the first ``n - b`` qubits select the chunk.
+
+Gates are queued and applied in streaming passes.  A pass groups
+consecutive gates that together touch at most two out-of-block qubits.  For
+each group of partner chunks differing only in those qubits, the chunks are
+read into one buffer.  The out-of-block qubits become the leading axes of the
+buffer, so every gate operand is local and the in-place kernels of
+:mod:`quantum.kernels` apply unchanged.  The buffer is then written back.
+Each pass reads and writes the file once, however many gates it holds.
+"""
+
+import os
+import tempfile
+import weakref
+
+import numpy as np
+
+from .ir import Instruction, GATE, TWO_QUBIT, CONTROLLED, PHASE_ORACLE, DIFFUSION
+from .kernels import apply_1q_inplace, apply_2q_inplace, apply_controlled_inplace
+from .measurement import format_bitstrings
+from .precision import resolve_dtype
+
+# A pass holds up to four partner chunks plus kernel scratch of 1.25x that
+_MAX_OUTER = 2
+_BUDGET_FACTOR = (1 << _MAX_OUTER) * 2.25
+
+
+def _remove_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class MemmapCircuit:
+    """State-vector simulator whose amplitudes live in a memory-mapped file.
+
+    Parameters
+    ----------
+    num_qubits : int
+        Number of qubits in the register.
+    path : str, optional
+        File holding the state.  A temporary file, removed by :meth:`close`
+        or when the circuit is garbage collected, is used when omitted.
+    memory_budget : int
+        Approximate bytes of RAM a streaming pass may use.
+    precision : {"single", "double"} or dtype, optional
+        Precision of the stored amplitudes; the global default when omitted.
+    """
+
+    def __init__(self, num_qubits: int, path=None, memory_budget: int = 256 * 2 ** 20,
+                 precision=None):
+        self.num_qubits = num_qubits
+        self.dtype = resolve_dtype(precision)
+        self._finalizer = None
+        if path is None:
+            handle, path = tempfile.mkstemp(suffix=".state")
+            os.close(handle)
+            self._finalizer = weakref.finalize(self, _remove_file, path)
+        self.path = path
+        self._data = np.memmap(path, dtype=self.dtype, mode="w+", shape=(2 ** num_qubits,))
+        self._data[0] = 1
+        chunk = int(memory_budget / (_BUDGET_FACTOR * self.dtype.itemsize))
+        if chunk < 1:
+            raise ValueError("memory_budget is too small for a single amplitude")
+        self.block_qubits = min(num_qubits, chunk.bit_length() - 1)
+        self.operations = []
+        self._pending = []
+
+    @property
+    def chunk_size(self) -> int:
+        return 2 ** self.block_qubits
+
+    @property
+    def num_chunks(self) -> int:
+        return 2 ** (self.num_qubits - self.block_qubits)
+
+    @property
+    def state(self):
+        """Memory-mapped state vector with all queued gates applied."""
+        self.flush()
+        return self._data
+
+    def statevector(self):
+        """Return a read-only view of the flushed state vector."""
+        view = self.state.view()
+        view.flags.writeable = False
+        return view
+
+    def close(self):
+        """Flush the state to disk and remove the file if it is temporary."""
+        self._data.flush()
+        data, self._data = self._data, None
+        del data
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _outer(self, qubits):
+        """Return the out-of-block qubits among ``qubits``."""
+        return {q for q in qubits if q < self.num_qubits - self.block_qubits}
+
+    def _queue(self, inst, qubits):
+        for q in qubits:
+            if not 0 <= q < self.num_qubits:
+                raise ValueError(f"qubit {q} out of range for {self.num_qubits} qubits")
+        self._pending.append((inst, inst.qubits))
+        self.operations.append(inst)
+
+    def apply_gate(self, gate, qubits):
+        """Queue a single-qubit gate on each of ``qubits``."""
+        qubits = list(qubits)
+        inst = Instruction(GATE, qubits, gate)
+        self._queue(inst, qubits)
+        # Each qubit is queued separately so a pass never spans too many chunks
+        self._pending[-1:] = [(inst, (q,)) for q in inst.qubits]
+
+    def apply_two_qubit_gate(self, gate, control, target):
+        """Queue a 4x4 gate on ``(control, target)``."""
+        if control == target:
+            raise ValueError("control and target must be different")
+        self._queue(Instruction(TWO_QUBIT, (control, target), gate), (control, target))
+
+    def apply_controlled_gate(self, gate, control, target):
+        """Queue a controlled single-qubit gate."""
+        if control == target:
+            raise ValueError("control and target must be different")
+        self._queue(Instruction(CONTROLLED, (control, target), gate), (control, target))
+
+    def apply_unitary(self, unitary):
+        """Reject dense unitaries, which cannot be applied chunk by chunk."""
+        raise ValueError("dense 2^n x 2^n unitaries are not supported out of core")
+
+    def apply_phase_oracle(self, mask):
+        """Flip the sign of the amplitudes marked in ``mask`` (array or memmap)."""
+        if len(mask) != 2 ** self.num_qubits:
+            raise ValueError("mask dimension mismatch")
+        self._queue(Instruction(PHASE_ORACLE, (), mask), ())
+
+    def apply_diffusion(self):
+        """Reflect the state about the uniform superposition."""
+        self._queue(Instruction(DIFFUSION), ())
+
+    def _passes(self):
+        """Split the pending queue into ``(outer_qubits, [(inst, qubits)])`` passes."""
+        passes = []
+        for inst, qubits in self._pending:
+            if inst.opcode in (PHASE_ORACLE, DIFFUSION):
+                passes.append((None, [(inst, qubits)]))
+                continue
+            outer = self._outer(qubits)
+            if passes and passes[-1][0] is not None and len(passes[-1][0] | outer) <= _MAX_OUTER:
+                passes[-1][0].update(outer)
+                passes[-1][1].append((inst, qubits))
+            else:
+                passes.append((set(outer), [(inst, qubits)]))
+        return passes
+
+    def _chunk_groups(self, outer):
+        """Yield lists of chunk indices forming each buffer for ``outer`` qubits."""
+        top = self.num_qubits - self.block_qubits
+        bits = [1 << (top - 1 - q) for q in outer]
+        mask = sum(bits)
+        offsets = [
+            sum(bit for i, bit in enumerate(bits) if (r >> (len(bits) - 1 - i)) & 1)
+            for r in range(1 << len(bits))
+        ]
+        for base in range(self.num_chunks):
+            if base & mask == 0:
+                yield [base + off for off in offsets]
+
+    def _stream(self, outer, fn):
+        """Call ``fn(buffer, chunks)`` on every group of partner chunks."""
+        size = self.chunk_size
+        buffer = np.empty((1 << len(outer)) * size, dtype=self.dtype)
+        for chunks in self._chunk_groups(outer):
+            for r, c in enumerate(chunks):
+                buffer[r * size:(r + 1) * size] = self._data[c * size:(c + 1) * size]
+            fn(buffer, chunks)
+            for r, c in enumerate(chunks):
+                self._data[c * size:(c + 1) * size] = buffer[r * size:(r + 1) * size]
+
+    def flush(self):
+        """Apply all queued gates in as few streaming passes as possible."""
+        passes = self._passes()
+        self._pending = []
+        for outer, insts in passes:
+            if outer is None:
+                self._full_register(insts[0][0])
+                continue
+            outer = sorted(outer)
+            local_n = len(outer) + self.block_qubits
+            shift = len(outer) - (self.num_qubits - self.block_qubits)
+            local = {q: i for i, q in enumerate(outer)}
+
+            def run(buffer, chunks, insts=insts, local=local, shift=shift, local_n=local_n):
+                for inst, qubits in insts:
+                    qs = [local.get(q, q + shift) for q in qubits]
+                    if inst.opcode == GATE:
+                        for q in qs:
+                            apply_1q_inplace(buffer, inst.matrix, q, local_n)
+                    elif inst.opcode == TWO_QUBIT:
+                        apply_2q_inplace(buffer, inst.matrix, qs[0], qs[1], local_n)
+                    else:
+                        apply_controlled_inplace(buffer, inst.matrix, qs[0], qs[1], local_n)
+
+            self._stream(outer, run)
+        self._data.flush()
+
+    def _full_register(self, inst):
+        size = self.chunk_size
+        if inst.opcode == PHASE_ORACLE:
+            def run(buffer, chunks):
+                marked = np.asarray(inst.data[chunks[0] * size:(chunks[0] + 1) * size], dtype=bool)
+                np.negative(buffer, out=buffer, where=marked)
+
+            self._stream([], run)
+            return
+        # Diffusion: one pass for the mean, accumulated in float64, one to reflect
+        total = 0j
+        for c in range(self.num_chunks):
+            total += self._data[c * size:(c + 1) * size].sum(dtype=complex)
+        mean = total / 2 ** self.num_qubits
+
+        def reflect(buffer, chunks):
+            np.negative(buffer, out=buffer)
+            buffer += 2 * mean
+
+        self._stream([], reflect)
+
+    def _chunk_probabilities(self):
+        """Yield ``(chunk_index, probabilities)`` for every chunk."""
+        self.flush()
+        size = self.chunk_size
+        for c in range(self.num_chunks):
+            yield c, np.square(np.abs(self._data[c * size:(c + 1) * size]), dtype=np.float64)
+
+    def probabilities(self):
+        """Return all ``2^n`` probabilities (this allocates them in RAM)."""
+        return np.concatenate([p for _, p in self._chunk_probabilities()])
+
+    def norm(self) -> float:
+        """Return the 2-norm of the state."""
+        return float(np.sqrt(sum(p.sum() for _, p in self._chunk_probabilities())))
+
+    def marginal_probabilities(self, qubits):
+        """Return the outcome distribution of measuring ``qubits``.
+
+        Uses the convention of :meth:`QuantumCircuit.measure_qubits`: qubit
+        ``q`` is bit ``q`` of the basis index and outcome bit ``i`` holds
+        ``qubits[i]``.
+        """
+        qubits = list(qubits)
+        n = self.num_qubits
+        size = self.chunk_size
+        marginal = np.zeros(2 ** len(qubits))
+        offsets = np.arange(size, dtype=np.int64)
+        for c, probs in self._chunk_probabilities():
+            index = c * size + offsets
+            outcome = np.zeros(size, dtype=np.int64)
+            for i, q in enumerate(qubits):
+                if not 0 <= q < n:
+                    raise ValueError(f"qubit {q} out of range for {n} qubits")
+                outcome |= ((index >> q) & 1) << i
+            marginal += np.bincount(outcome, weights=probs, minlength=len(marginal))
+        return marginal
+
+    def sample(self, shots, seed=None):
+        """Return a ``{bitstring: count}`` histogram of ``shots`` samples.
+
+        Shots are first distributed over chunks by the chunk weights, then
+        drawn within each chunk, so only one chunk is in memory at a time.
+        """
+        rng = np.random.default_rng(seed)
+        weights = np.array([p.sum() for _, p in self._chunk_probabilities()])
+        per_chunk = rng.multinomial(shots, weights / weights.sum())
+        size = self.chunk_size
+        outcomes = []
+        for c, probs in self._chunk_probabilities():
+            if per_chunk[c]:
+                cdf = np.cumsum(probs)
+                draws = np.searchsorted(cdf, rng.random(per_chunk[c]) * cdf[-1], side="right")
+                outcomes.append(c * size + np.minimum(draws, size - 1))
+        values, counts = np.unique(np.concatenate(outcomes), return_counts=True)
+        return dict(zip(format_bitstrings(values, self.num_qubits), counts.tolist()))
+
+    def measure_all(self):
+        """Return a bitstring measurement of the entire register."""
+        return next(iter(self.sample(1, seed=np.random.randint(2 ** 32))))
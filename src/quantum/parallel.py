@@ -0,0 +1,123 @@
+"""Worker threads shared by the multi-core gate kernels.
+
+A gate on qubit ``q`` pairs each amplitude with exactly one partner, so the
+pairs can be split into disjoint blocks and updated concurrently.  The
+in-place kernels of :mod:`quantum.kernels` do this when more than one thread
+is configured.  Their NumPy ufuncs release the GIL, so plain threads run the
+blocks on separate cores without copying the state.
+
+The worker count defaults to one, the serial behaviour.  It can be set per
+circuit with ``QuantumCircuit(n, num_threads=4)`` or globally with
+:func:`set_num_threads`.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+# Blocks smaller than this many amplitudes are not worth a thread hand-off
+MIN_BLOCK = 1 << 14
+
+_default = 1
+_executor = None
+_lock = threading.Lock()
+
+
+def resolve_threads(num_threads=None) -> int:
+    """Return the worker count for ``num_threads``.
+
+    ``None`` selects the global default and ``0`` or a negative value selects
+    every available core.
+    """
+    if num_threads is None:
+        return _default
+    num_threads = int(num_threads)
+    if num_threads <= 0:
+        return os.cpu_count() or 1
+    return num_threads
+
+
+def get_num_threads() -> int:
+    """Return the global default worker count."""
+    return _default
+
+
+def set_num_threads(num_threads) -> None:
+    """Set the global default worker count of the gate kernels.
+
+    ``None``, ``0`` or a negative value use every available core.
+    """
+    global _default
+    _default = resolve_threads(0 if num_threads is None else num_threads)
+
+
+@contextmanager
+def thread_scope(num_threads):
+    """Temporarily change the global default worker count."""
+    previous = _default
+    set_num_threads(num_threads)
+    try:
+        yield
+    finally:
+        set_num_threads(previous)
+
+
+def _pool(workers):
+    """Return the shared executor, growing it to at least ``workers`` threads."""
+    global _executor
+    with _lock:
+        if _executor is None or _executor._max_workers < workers:
+            # Threads still submitting to the old pool keep it alive; its
+            # workers exit once it is no longer referenced
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quantum-kernel")
+        return _executor
+
+
+def _reset_after_fork():
+    # Worker threads do not survive fork; the child builds its own pool
+    global _executor, _lock
+    _executor = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def partition(shape, num_threads):
+    """Return index tuples splitting arrays of ``shape`` into blocks.
+
+    The longest axis is cut into at most ``num_threads`` ranges, none
+    smaller than :data:`MIN_BLOCK` amplitudes.  An empty list means the
+    array is too small to be worth splitting.
+    """
+    size = int(np.prod(shape))
+    parts = min(num_threads, size // MIN_BLOCK)
+    if parts <= 1:
+        return []
+    axis = int(np.argmax(shape))
+    parts = min(parts, shape[axis])
+    bounds = np.linspace(0, shape[axis], parts + 1).astype(int)
+    lead = (slice(None),) * axis
+    return [lead + (slice(lo, hi),) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def run_blocks(fn, blocks):
+    """Call ``fn(block)`` for every block, spreading them over the pool.
+
+    The calling thread processes the first block itself.  Exceptions raised
+    by any block propagate once every block has finished.
+    """
+    if len(blocks) == 1:
+        fn(blocks[0])
+        return
+    pool = _pool(len(blocks) - 1)
+    futures = [pool.submit(fn, block) for block in blocks[1:]]
+    try:
+        fn(blocks[0])
+    finally:
+        for future in futures:
+            future.result()
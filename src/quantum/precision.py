@@ -0,0 +1,58 @@
+"""Floating-point precision of simulated state vectors.
+
+State vectors default to double precision (``complex128``).  Single
+precision (``complex64``) halves memory and bandwidth, buying one extra
+qubit of headroom.  The precision can be chosen per circuit with
+``QuantumCircuit(n, precision="single")`` or globally with
+:func:`set_precision`.  Probabilities, norms and expectation values are
+always accumulated in float64, whatever the state precision.
+"""
+
+from contextlib import contextmanager
+
+import numpy as np
+
+PRECISIONS = {
+    "double": np.dtype(np.complex128),
+    "single": np.dtype(np.complex64),
+}
+
+_default = PRECISIONS["double"]
+
+
+def resolve_dtype(precision=None) -> np.dtype:
+    """Return the complex dtype for ``precision``.
+
+    ``precision`` is ``"single"``, ``"double"``, a complex NumPy dtype, or
+    ``None`` for the global default.
+    """
+    if precision is None:
+        return _default
+    if isinstance(precision, str) and precision in PRECISIONS:
+        return PRECISIONS[precision]
+    dtype = np.dtype(precision)
+    if dtype not in PRECISIONS.values():
+        raise ValueError(f"unsupported precision {precision!r}")
+    return dtype
+
+
+def get_precision() -> str:
+    """Return the name of the global default precision."""
+    return "single" if _default == PRECISIONS["single"] else "double"
+
+
+def set_precision(precision) -> None:
+    """Set the global default precision of new circuits and rotation gates."""
+    global _default
+    _default = resolve_dtype(precision)
+
+
+@contextmanager
+def precision_scope(precision):
+    """Temporarily change the global default precision."""
+    previous = _default
+    set_precision(precision)
+    try:
+        yield
+    finally:
+        set_precision(previous)
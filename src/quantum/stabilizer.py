@@ -0,0 +1,454 @@
+"""Polynomial-time simulation of Clifford circuits with a stabilizer tableau.
+
+:class:`StabilizerCircuit` implements the CHP algorithm of Aaronson and
+Gottesman.  An ``n``-qubit stabilizer state is stored as ``n``
+destabilizer and ``n`` stabilizer generators.  Each generator is a signed
+Pauli string kept as bit-packed ``x`` and ``z`` rows (eight qubits per byte)
+plus a sign bit.  Clifford gates update one or two bit columns of the
+tableau in ``O(n)``.  A measurement multiplies rows in ``O(n^2 / 64)``
+vectorized 64-bit word operations, so thousands of qubits are practical.
+
+Supported gates are every single-qubit Clifford (``H``, ``S``, ``X``, ``Y``,
+``Z``, ``S^dagger``, ``RZ(pi/2)`` ... recognized up to a global phase), the
+two-qubit gates ``CNOT`` (either orientation), ``CZ`` and ``SWAP``, and
+controlled ``X``, ``Y`` and ``Z``.  Qubit conventions follow
+:class:`quantum.QuantumCircuit`: gates address qubit ``q`` as axis ``q``,
+while :meth:`StabilizerCircuit.measure_qubits` and the marginals treat
+qubit ``q`` as bit ``q`` of the basis index.
+
+:func:`simulate` replays a recorded ``operations`` log on this backend when
+every operation is Clifford and on a state vector otherwise.
+"""
+
+import numpy as np
+
+from .gates import H, S, X, Z, I, CNOT
+from .circuit import QuantumCircuit, replay_operations
+from .ir import Instruction, GATE, TWO_QUBIT, CONTROLLED, UNITARY, PHASE_ORACLE, DIFFUSION
+from .measurement import _axes
+from .pauli import PauliSum
+
+Y = np.array([[0, -1j], [1j, 0]], dtype=complex)
+
+_M1, _M2, _M4, _H01 = (np.uint64(v) for v in (
+    0x5555555555555555, 0x3333333333333333, 0x0F0F0F0F0F0F0F0F, 0x0101010101010101
+))
+
+
+def _popcount(words):
+    """Return the number of set bits of each ``uint64`` in ``words``."""
+    words = words - ((words >> np.uint64(1)) & _M1)
+    words = (words & _M2) + ((words >> np.uint64(2)) & _M2)
+    words = (words + (words >> np.uint64(4))) & _M4
+    return ((words * _H01) >> np.uint64(56)).astype(np.int64)
+
+
+def _same_up_to_phase(a, b, atol=1e-9):
+    return a.shape == b.shape and abs(abs(np.vdot(a, b)) - len(a)) <= atol
+
+
+def _single_qubit_cliffords():
+    """Return ``(word, matrix)`` for the 24 single-qubit Cliffords.
+
+    A word is the shortest sequence of primitive gates, applied left to
+    right, that produces the matrix up to a global phase.
+    """
+    primitives = {"h": H, "s": S, "x": X, "y": Y, "z": Z}
+    table = [((), I)]
+    frontier = table
+    while frontier:
+        found = []
+        for word, matrix in frontier:
+            for name, gate in primitives.items():
+                candidate = gate @ matrix
+                if not any(_same_up_to_phase(candidate, m) for _, m in table + found):
+                    found.append((word + (name,), candidate))
+        table += found
+        frontier = found
+    return table
+
+
+_CLIFFORD_1Q = _single_qubit_cliffords()
+_CLIFFORD_1Q_STACK = np.array([m for _, m in _CLIFFORD_1Q])
+
+# Two-qubit words address the instruction's qubits by position
+_SWAP = np.eye(4, dtype=complex)[[0, 2, 1, 3]]
+_CLIFFORD_2Q = [
+    ((("cx", 0, 1),), CNOT),
+    ((("cx", 1, 0),), _SWAP @ CNOT @ _SWAP),
+    ((("h", 1), ("cx", 0, 1), ("h", 1)), np.diag([1, 1, 1, -1]).astype(complex)),
+    ((("cx", 0, 1), ("cx", 1, 0), ("cx", 0, 1)), _SWAP),
+]
+
+# Controlled gates must match exactly: a phase on U is not global once controlled
+_CONTROLLED = [
+    ((), I),
+    ((("cx", 0, 1),), X),
+    ((("h", 1), ("cx", 0, 1), ("h", 1)), Z),
+    ((("s", 1), ("s", 1), ("s", 1), ("cx", 0, 1), ("s", 1)), Y),
+]
+
+_decompositions = {}
+
+
+def _decompose(inst):
+    """Return the primitive gate word of ``inst``, or ``None`` if not Clifford."""
+    key = None
+    if inst.gate is not None:
+        key = (inst.opcode, inst.gate, inst.params)
+        if key in _decompositions:
+            return _decompositions[key]
+    word = None
+    matrix = inst.matrix
+    if inst.opcode == GATE and np.shape(matrix) == (2, 2):
+        overlaps = np.abs(np.einsum("kij,ij->k", _CLIFFORD_1Q_STACK.conj(), matrix))
+        match = np.flatnonzero(np.abs(overlaps - 2) <= 1e-9)
+        if match.size:
+            word = tuple((name, 0) for name in _CLIFFORD_1Q[match[0]][0])
+    elif inst.opcode == TWO_QUBIT and np.shape(matrix) == (4, 4):
+        for candidate, reference in _CLIFFORD_2Q:
+            if _same_up_to_phase(np.asarray(matrix), reference):
+                word = candidate
+                break
+    elif inst.opcode == CONTROLLED and np.shape(matrix) == (2, 2):
+        for candidate, reference in _CONTROLLED:
+            if np.allclose(matrix, reference, rtol=0, atol=1e-9):
+                word = candidate
+                break
+    if key is not None:
+        _decompositions[key] = word
+    return word
+
+
+def is_clifford(operations) -> bool:
+    """Return whether every entry of ``operations`` is a supported Clifford gate."""
+    for op in map(Instruction.from_tuple, operations):
+        if op.opcode in (UNITARY, PHASE_ORACLE, DIFFUSION) or _decompose(op) is None:
+            return False
+    return True
+
+
+def simulate(operations, num_qubits, **kwargs):
+    """Replay ``operations`` on the cheapest exact backend and return it.
+
+    A :class:`StabilizerCircuit` is used when every operation is Clifford,
+    and a ``QuantumCircuit(num_qubits, **kwargs)`` otherwise.
+    """
+    operations = list(operations)
+    if is_clifford(operations):
+        target = StabilizerCircuit(num_qubits)
+    else:
+        target = QuantumCircuit(num_qubits, **kwargs)
+    return replay_operations(operations, target)
+
+
+def _product(x1, z1, r1, x2, z2, r2):
+    """Return the signed Pauli ``P1 P2`` of two packed rows (or row stacks)."""
+    x1, z1, x2, z2 = (a.view(np.uint64) for a in (x1, z1, x2, z2))
+    # Exponent of i picked up per qubit (the CHP function g), counted as +1s and -1s
+    plus = (x1 & z1 & z2 & ~x2) | (x1 & ~z1 & z2 & x2) | (~x1 & z1 & x2 & ~z2)
+    minus = (x1 & z1 & x2 & ~z2) | (x1 & ~z1 & z2 & ~x2) | (~x1 & z1 & x2 & z2)
+    g = _popcount(plus).sum(axis=-1) - _popcount(minus).sum(axis=-1)
+    phase = (2 * np.asarray(r1, dtype=np.int64) + 2 * np.asarray(r2, dtype=np.int64) + g) % 4
+    return (x1 ^ x2).view(np.uint8), (z1 ^ z2).view(np.uint8), phase >= 2
+
+
+def _reduce(x, z, r):
+    """Return the product of commuting signed Paulis by pairwise reduction."""
+    while len(r) > 1:
+        half = len(r) // 2
+        px, pz, pr = _product(x[:half], z[:half], r[:half],
+                              x[half:2 * half], z[half:2 * half], r[half:2 * half])
+        if len(r) % 2:
+            px, pz, pr = np.vstack([px, x[-1:]]), np.vstack([pz, z[-1:]]), np.append(pr, r[-1])
+        x, z, r = px, pz, pr
+    return x[0], z[0], bool(r[0])
+
+
+class StabilizerCircuit:
+    """Clifford-circuit simulator with the gate API of ``QuantumCircuit``.
+
+    Parameters
+    ----------
+    num_qubits : int
+        Number of qubits in the register, initialized to ``|0...0>``.
+
+    Rows ``0 .. n-1`` of the tableau hold destabilizers and rows
+    ``n .. 2n-1`` stabilizers.  Bit ``q % 8`` of byte ``q // 8`` in a row
+    belongs to qubit ``q``, and ``x = z = 1`` denotes ``Y``.  Rows are
+    padded to whole 64-bit words so they can be multiplied word-wise.
+    """
+
+    def __init__(self, num_qubits: int):
+        self.num_qubits = num_qubits
+        n = num_qubits
+        width = 8 * ((n + 63) // 64)
+        self.x = np.zeros((2 * n, width), dtype=np.uint8)
+        self.z = np.zeros((2 * n, width), dtype=np.uint8)
+        self.r = np.zeros(2 * n, dtype=bool)
+        rows = np.arange(n)
+        bits = (1 << (rows & 7)).astype(np.uint8)
+        self.x[rows, rows >> 3] = bits
+        self.z[n + rows, rows >> 3] = bits
+        self.operations = []
+        self._support = None
+
+    def copy(self):
+        """Return an independent copy of the tableau."""
+        other = StabilizerCircuit.__new__(StabilizerCircuit)
+        other.num_qubits = self.num_qubits
+        other.x, other.z, other.r = self.x.copy(), self.z.copy(), self.r.copy()
+        other.operations = list(self.operations)
+        other._support = self._support
+        return other
+
+    @staticmethod
+    def _bit(q):
+        return q >> 3, np.uint8(1 << (q & 7))
+
+    def _columns(self, q):
+        byte, mask = self._bit(q)
+        return (self.x[:, byte] & mask) != 0, (self.z[:, byte] & mask) != 0
+
+    def _check(self, qubits):
+        for q in qubits:
+            if not 0 <= q < self.num_qubits:
+                raise ValueError(f"qubit {q} out of range for {self.num_qubits} qubits")
+
+    def _primitive(self, name, a, b=None):
+        """Apply one primitive Clifford gate to the tableau columns."""
+        xa, za = self._columns(a)
+        byte, mask = self._bit(a)
+        if name == "h":
+            self.r ^= xa & za
+            diff = np.where(xa ^ za, mask, np.uint8(0))
+            self.x[:, byte] ^= diff
+            self.z[:, byte] ^= diff
+        elif name == "s":
+            self.r ^= xa & za
+            self.z[:, byte] ^= np.where(xa, mask, np.uint8(0))
+        elif name == "x":
+            self.r ^= za
+        elif name == "z":
+            self.r ^= xa
+        elif name == "y":
+            self.r ^= xa ^ za
+        else:
+            xb, zb = self._columns(b)
+            byte_b, mask_b = self._bit(b)
+            self.r ^= xa & zb & ~(xb ^ za)
+            self.x[:, byte_b] ^= np.where(xa, mask_b, np.uint8(0))
+            self.z[:, byte] ^= np.where(zb, mask, np.uint8(0))
+
+    def _apply(self, inst):
+        word = _decompose(inst)
+        if word is None:
+            raise ValueError(f"{inst.name} is not a supported Clifford operation")
+        self._check(inst.qubits)
+        if inst.opcode == GATE:
+            for q in inst.qubits:
+                for name, _ in word:
+                    self._primitive(name, q)
+        else:
+            for name, *positions in word:
+                self._primitive(name, *(inst.qubits[p] for p in positions))
+        self._support = None
+        self.operations.append(inst)
+
+    def apply_gate(self, gate, qubits):
+        """Apply a single-qubit Clifford gate to the specified qubits."""
+        self._apply(Instruction(GATE, qubits, gate))
+
+    def apply_two_qubit_gate(self, gate, control, target):
+        """Apply ``CNOT``, ``CZ`` or ``SWAP`` given as a 4x4 matrix."""
+        if control == target:
+            raise ValueError("control and target must be different")
+        self._apply(Instruction(TWO_QUBIT, (control, target), gate))
+
+    def apply_controlled_gate(self, gate, control, target):
+        """Apply a controlled ``X``, ``Y`` or ``Z``."""
+        if control == target:
+            raise ValueError("control and target must be different")
+        self._apply(Instruction(CONTROLLED, (control, target), gate))
+
+    def apply_unitary(self, unitary):
+        """Reject dense unitaries, which are not tracked as Clifford operations."""
+        raise ValueError("dense unitaries are not supported by the stabilizer backend")
+
+    def apply_phase_oracle(self, mask):
+        """Reject phase oracles, which are not Clifford operations."""
+        raise ValueError("phase oracles are not Clifford operations")
+
+    def apply_diffusion(self):
+        """Reject the diffusion operator, which is not a Clifford operation."""
+        raise ValueError("the diffusion operator is not a Clifford operation")
+
+    def _measure(self, q):
+        """Measure qubit ``q`` (an axis index) in the Z basis and collapse."""
+        n = self.num_qubits
+        byte, mask = self._bit(q)
+        xq = (self.x[:, byte] & mask) != 0
+        anticommuting = np.flatnonzero(xq[n:])
+        if anticommuting.size == 0:
+            # Deterministic: +-Z_q is the product of the stabilizers whose
+            # destabilizers anticommute with Z_q
+            rows = n + np.flatnonzero(xq[:n])
+            return int(_reduce(self.x[rows], self.z[rows], self.r[rows])[2])
+        p = n + anticommuting[0]
+        targets = np.flatnonzero(xq)
+        targets = targets[targets != p]
+        self.x[targets], self.z[targets], self.r[targets] = _product(
+            self.x[p], self.z[p], self.r[p], self.x[targets], self.z[targets], self.r[targets]
+        )
+        self.x[p - n], self.z[p - n], self.r[p - n] = self.x[p], self.z[p], self.r[p]
+        self.x[p] = 0
+        self.z[p] = 0
+        self.z[p, byte] = mask
+        outcome = np.random.randint(2)
+        self.r[p] = bool(outcome)
+        self._support = None
+        return outcome
+
+    def measure_qubits(self, qubits):
+        """Measure ``qubits`` and collapse the state accordingly.
+
+        Follows the conventions of :meth:`QuantumCircuit.measure_qubits`.
+        """
+        return "".join(str(self._measure(axis)) for axis in _axes(qubits, self.num_qubits))
+
+    def _affine_support(self):
+        """Return ``(offset, basis)`` describing the measurement distribution.
+
+        Measuring every qubit of a stabilizer state yields a uniformly random
+        element of ``offset + span(basis)``.  ``offset`` holds one bit per
+        qubit and the rows of ``basis`` are the ``x`` parts of independent
+        stabilizers, unpacked to one bit per qubit.
+        """
+        if self._support is not None:
+            return self._support
+        n = self.num_qubits
+        x, z, r = self.x[n:].copy(), self.z[n:].copy(), self.r[n:].copy()
+        rank = 0
+        for q in range(n):
+            byte, mask = self._bit(q)
+            rows = rank + np.flatnonzero(x[rank:, byte] & mask)
+            if rows.size == 0:
+                continue
+            pivot = rows[0]
+            for arr in (x, z, r):
+                arr[[rank, pivot]] = arr[[pivot, rank]]
+            rows = rows[1:]
+            x[rows], z[rows], r[rows] = _product(x[rank], z[rank], r[rank], x[rows], z[rows], r[rows])
+            rank += 1
+        basis = np.unpackbits(x[:rank], axis=1, count=n, bitorder="little")
+        # Remaining generators are +-Z strings: bits ``v`` fix ``v . s = sign``
+        constraints = z[rank:]
+        signs = r[rank:]
+        pivots = []
+        row = 0
+        for q in range(n):
+            byte, mask = self._bit(q)
+            hits = row + np.flatnonzero(constraints[row:, byte] & mask)
+            if hits.size == 0:
+                continue
+            pivot = hits[0]
+            constraints[[row, pivot]] = constraints[[pivot, row]]
+            signs[[row, pivot]] = signs[[pivot, row]]
+            others = np.flatnonzero(constraints[:, byte] & mask)
+            others = others[others != row]
+            constraints[others] ^= constraints[row]
+            signs[others] ^= signs[row]
+            pivots.append(q)
+            row += 1
+        # Free bits are set to zero, so pivot bits equal their signs
+        offset = np.zeros(n, dtype=np.uint8)
+        offset[pivots] = signs[:row]
+        self._support = offset, basis
+        return self._support
+
+    def sample(self, shots, qubits=None, seed=None, output="counts"):
+        """Draw ``shots`` measurement samples without collapsing the state.
+
+        Accepts the arguments of :meth:`QuantumCircuit.sample`.  Samples are
+        drawn in ``O(shots * n * rank)`` from the affine support of the
+        state, so no state vector is ever formed.
+        """
+        n = self.num_qubits
+        offset, basis = self._affine_support()
+        rng = np.random.default_rng(seed) if seed is not None else None
+        size = (shots, len(basis))
+        coeffs = rng.integers(0, 2, size) if rng is not None else np.random.randint(0, 2, size)
+        bits = (coeffs.astype(np.float32) @ basis.astype(np.float32)).astype(np.int64) % 2
+        bits = (bits ^ offset).astype(np.uint8)
+        columns = list(range(n)) if qubits is None else _axes(qubits, n)
+        bits = bits[:, columns]
+        if output == "bits":
+            return np.packbits(bits, axis=1)
+        if output != "counts":
+            raise ValueError("output must be 'counts' or 'bits'")
+        rows, counts = np.unique(bits, axis=0, return_counts=True)
+        keys = ["".join(map(str, row)) for row in rows]
+        return dict(zip(keys, counts.tolist()))
+
+    def measure_all(self):
+        """Return a bitstring measurement of the entire register."""
+        return next(iter(self.sample(1)))
+
+    def measure(self):
+        """Sample a basis-state index from the state distribution."""
+        return int(self.measure_all(), 2)
+
+    def marginal_probabilities(self, qubits):
+        """Return the outcome distribution of measuring ``qubits``.
+
+        Uses the qubit convention of :meth:`QuantumCircuit.measure_qubits`;
+        the result has ``2^len(qubits)`` entries.
+        """
+        columns = _axes(qubits, self.num_qubits)
+        offset, basis = self._affine_support()
+        weights = 1 << np.arange(len(columns), dtype=np.int64)
+        reachable = np.array([offset[columns] @ weights])
+        independent = []
+        for v in basis[:, columns] @ weights:
+            for b in independent:
+                v = min(v, v ^ b)
+            if v:
+                independent.append(v)
+                reachable = np.concatenate([reachable, reachable ^ v])
+        probs = np.zeros(2 ** len(columns))
+        probs[reachable] = 1 / len(reachable)
+        return probs
+
+    def probabilities(self):
+        """Return the probability of each computational basis state."""
+        return self.marginal_probabilities(range(self.num_qubits))
+
+    def expectation(self, observable) -> complex:
+        """Return the expectation value of a :class:`quantum.PauliSum`.
+
+        Each Pauli string has expectation ``+-1`` when it (up to sign) is a
+        stabilizer of the state and ``0`` otherwise.
+        """
+        if not isinstance(observable, PauliSum):
+            raise TypeError("the stabilizer backend only evaluates PauliSum observables")
+        if observable.num_qubits != self.num_qubits:
+            raise ValueError("observable dimension mismatch")
+        n = self.num_qubits
+        total = 0j
+        for coeff, pauli in observable.terms:
+            chars = np.frombuffer(pauli.encode(), dtype=np.uint8)
+            px = np.packbits((chars == ord("X")) | (chars == ord("Y")), bitorder="little")
+            pz = np.packbits((chars == ord("Z")) | (chars == ord("Y")), bitorder="little")
+            width = self.x.shape[1]
+            px, pz = (np.pad(v, (0, width - len(v))) for v in (px, pz))
+            overlap = ((self.x & pz) ^ (self.z & px)).view(np.uint64)
+            anti = (_popcount(overlap).sum(axis=1) & 1).astype(bool)
+            if anti[n:].any():
+                continue
+            rows = n + np.flatnonzero(anti[:n])
+            if rows.size == 0:
+                total += coeff
+                continue
+            _, _, sign = _reduce(self.x[rows], self.z[rows], self.r[rows])
+            total += -coeff if sign else coeff
+        return total
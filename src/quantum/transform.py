@@ -4,17 +4,48 @@ import numpy as np
 
 from .circuit import tensor, apply_single_qubit_gate
 from .gates import H
+from .kernels import apply_2q_inplace
 
 
 def qft(n):
     """Quantum Fourier Transform matrix for n qubits."""
     N = 2 ** n
-    omega = np.exp(2j * np.pi / N)
-    F = np.zeros((N, N), dtype=complex)
-    for i in range(N):
-        for j in range(N):
-            F[i, j] = omega ** (i * j)
-    return F / np.sqrt(N)
+    k = np.arange(N)
+    # Reduce the exponent modulo N before scaling to keep the phases accurate
+    return np.exp(2j * np.pi * (np.outer(k, k) % N) / N) / np.sqrt(N)
+
+
+def apply_qft(state, qubits, n, inverse=False):
+    """Apply the (inverse) QFT to the register formed by ``qubits``.
+
+    Parameters
+    ----------
+    state : np.ndarray
+        State vector of ``n`` qubits.
+    qubits : iterable[int]
+        Register qubits ordered from least to most significant bit.
+    n : int
+        Total number of qubits in ``state``.
+    inverse : bool, optional
+        Apply the inverse transform instead.
+
+    The register axes are moved to the front in most-significant-first order,
+    which performs the bit reversal as a pure index permutation, and the
+    transform is evaluated with ``np.fft`` along that axis in
+    ``O(2^n log 2^k)`` time without building the ``2^k x 2^k`` matrix.
+    """
+    qubits = list(qubits)
+    if len(set(qubits)) != len(qubits):
+        raise ValueError("qubits must be distinct")
+    k = len(qubits)
+    axes = qubits[::-1] + [a for a in range(n) if a not in qubits]
+    register = np.transpose(np.asarray(state).reshape([2] * n), axes).reshape(2 ** k, -1)
+    if inverse:
+        register = np.fft.fft(register, axis=0, norm="ortho")
+    else:
+        register = np.fft.ifft(register, axis=0, norm="ortho")
+    register = np.transpose(register.reshape([2] * n), np.argsort(axes))
+    return np.ascontiguousarray(register).reshape(2 ** n)
 
 
 def swap_qubits(state, q1, q2, n):
@@ -23,14 +54,33 @@ def swap_qubits(state, q1, q2, n):
     return state.reshape(2 ** n)
 
 
+def controlled_phase(angle):
+    """Return the diagonal 4x4 controlled-phase gate for ``angle``."""
+    return np.diag([1, 1, 1, np.exp(1j * angle)]).astype(complex)
+
+
 def apply_controlled_phase(state, control, target, angle, n):
-    indices = np.arange(len(state))
-    mask = ((indices >> control) & 1) & ((indices >> target) & 1)
-    state[mask] *= np.exp(1j * angle)
+    """Multiply amplitudes where ``control`` and ``target`` are |1> by a phase.
+
+    Only the quarter of the state with both qubits set is touched, through a
+    strided view, so no index arrays are built.
+    """
+    state = np.ascontiguousarray(state)
+    apply_2q_inplace(state, controlled_phase(angle), control, target, n)
     return state
 
 
 def apply_inverse_qft(state, n, total_qubits):
+    """Apply the inverse QFT to qubits ``0..n-1`` with qubit ``k`` as bit ``k``."""
+    return apply_qft(state, range(n), total_qubits, inverse=True)
+
+
+def apply_inverse_qft_gates(state, n, total_qubits):
+    """Gate-by-gate inverse QFT equivalent to :func:`apply_inverse_qft`.
+
+    Kept as a reference for the FFT engine; it performs ``O(n^2)`` passes over
+    the full state.
+    """
     for q in range(n // 2):
         state = swap_qubits(state, q, n - q - 1, total_qubits)
     for j in range(n):
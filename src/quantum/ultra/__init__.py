@@ -11,6 +11,8 @@ from .qnn import QuantumNeuralNetwork
 from .advanced_scheduling import Scheduler
 from .autoencoder import QuantumAutoencoder
 from .synergy import HybridRuntime
+from .cache import ResultCache
+from .sharded import ShardedCircuit
 
 __all__ = [
     "QuantumOrchestrator",
@@ -19,4 +21,6 @@ __all__ = [
     "Scheduler",
     "QuantumAutoencoder",
     "HybridRuntime",
+    "ResultCache",
+    "ShardedCircuit",
 ]
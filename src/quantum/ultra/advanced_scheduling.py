@@ -1,10 +1,84 @@
 """Sophisticated scheduling and resource management."""
 
+from collections import deque
+
+from ..ir import Instruction
+
+# Relative cost, in amplitude updates per 2^n, of each recorded operation kind
+_OPERATION_WEIGHTS = {
+    "gate": 1.0,
+    "two_qubit": 2.0,
+    "controlled": 0.5,
+    "phase_oracle": 0.5,
+    "diffusion": 1.0,
+}
+
+
+def estimate_cost(circuit, shots=None) -> float:
+    """Estimate the work needed to execute ``circuit``.
+
+    The cost is measured in amplitude updates: every operation in
+    ``circuit.operations`` touches the ``2^n`` state vector a weighted number
+    of times (once per target qubit for single-qubit gates, ``2^n`` times for a
+    dense unitary), and measurement adds one pass to build the cumulative
+    distribution plus ``n`` comparisons per shot.
+
+    Parameters
+    ----------
+    circuit : QuantumCircuit
+        Circuit whose recorded operations are costed.
+    shots : int, optional
+        Number of samples drawn from the final state; one when omitted.
+    """
+    n = circuit.num_qubits
+    dim = 2 ** n
+    cost = 0.0
+    for op in getattr(circuit, "operations", ()):
+        op = Instruction.from_tuple(op)
+        kind = op.opcode
+        if kind == "gate":
+            cost += len(op.qubits) * dim
+        elif kind == "unitary":
+            cost += dim * dim
+        else:
+            cost += _OPERATION_WEIGHTS.get(kind, 1.0) * dim
+    return cost + dim + (shots or 1) * max(n, 1)
+
+
 class Scheduler:
-    """Determine optimal job placement on quantum hardware."""
+    """Determine optimal job placement on quantum hardware.
+
+    Parameters
+    ----------
+    strategy : {"noise", "lpt", "work_stealing"}
+        ``"noise"`` keeps the original round-robin placement over devices
+        sorted by ``noise_level``.  ``"lpt"`` sorts jobs by estimated cost,
+        longest first, and places each on the device that would finish it
+        earliest.  ``"work_stealing"`` deals jobs round-robin into per-device
+        queues and simulates idle devices stealing from the tail of the most
+        loaded queue.
+    shots : int, optional
+        Shots per circuit used by the cost model.
+
+    After :meth:`schedule` the scheduler exposes ``device_loads`` (predicted
+    busy time of each device, including any initial ``queue_time``) and
+    ``makespan`` (the largest of those loads).  Devices may declare
+    ``speed`` (work units per time unit, default 1), ``max_qubits``
+    (capacity) and ``queue_time`` (work already queued).
+    """
+
+    STRATEGIES = ("noise", "lpt", "work_stealing")
+
+    def __init__(self, strategy: str = "noise", shots=None):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"strategy must be one of {self.STRATEGIES}")
+        self.strategy = strategy
+        self.shots = shots
+        self.device_loads = []
+        self.makespan = 0.0
 
     def schedule(self, circuits, devices):
-        """Return a simple noise-aware schedule.
+        """Return a schedule for ``circuits`` according to ``strategy``.
 
         Parameters
         ----------
@@ -16,11 +90,91 @@ class Scheduler:
         Returns
         -------
         list[tuple[int, object]]
-            Pairs of ``device_index`` and ``circuit`` to execute.
+            Pairs of ``device_index`` and ``circuit`` to execute, in the
+            order of ``circuits``.
         """
+        if not devices:
+            raise ValueError("no devices available")
+        costs = [estimate_cost(c, self.shots) for c in circuits]
+        loads = [float(getattr(d, "queue_time", 0.0)) for d in devices]
+        if self.strategy == "noise":
+            placement = self._noise_order(circuits, devices)
+        elif self.strategy == "lpt":
+            placement = self._lpt(circuits, devices, costs, loads)
+        else:
+            placement = self._work_stealing(circuits, devices, costs, loads)
+        if self.strategy == "noise":
+            for idx, dev_idx in enumerate(placement):
+                loads[dev_idx] += costs[idx] / self._speed(devices[dev_idx])
+        self.device_loads = loads
+        self.makespan = max(loads)
+        return [(dev_idx, circuit) for dev_idx, circuit in zip(placement, circuits)]
+
+    def plan(self, circuits, devices):
+        """Return ``(schedule, makespan)`` for ``circuits`` on ``devices``."""
+        schedule = self.schedule(circuits, devices)
+        return schedule, self.makespan
+
+    @staticmethod
+    def _speed(device):
+        return float(getattr(device, "speed", 1.0))
+
+    @staticmethod
+    def _eligible(circuit, devices):
+        eligible = [
+            i for i, d in enumerate(devices)
+            if getattr(d, "max_qubits", None) is None or circuit.num_qubits <= d.max_qubits
+        ]
+        if not eligible:
+            raise ValueError(f"no device can hold a {circuit.num_qubits}-qubit circuit")
+        return eligible
+
+    def _noise_order(self, circuits, devices):
         order = sorted(range(len(devices)), key=lambda i: getattr(devices[i], "noise_level", 0))
-        schedule = []
-        for idx, circuit in enumerate(circuits):
-            dev_idx = order[idx % len(devices)]
-            schedule.append((dev_idx, circuit))
-        return schedule
+        return [order[idx % len(devices)] for idx in range(len(circuits))]
+
+    def _lpt(self, circuits, devices, costs, loads):
+        placement = [None] * len(circuits)
+        for idx in sorted(range(len(circuits)), key=lambda i: -costs[i]):
+            dev_idx = min(
+                self._eligible(circuits[idx], devices),
+                key=lambda d: loads[d] + costs[idx] / self._speed(devices[d]),
+            )
+            loads[dev_idx] += costs[idx] / self._speed(devices[dev_idx])
+            placement[idx] = dev_idx
+        return placement
+
+    def _work_stealing(self, circuits, devices, costs, loads):
+        eligible = [set(self._eligible(c, devices)) for c in circuits]
+        queues = [deque() for _ in devices]
+        for idx in range(len(circuits)):
+            owners = sorted(eligible[idx])
+            queues[owners[idx % len(owners)]].append(idx)
+        placement = [None] * len(circuits)
+        remaining = len(circuits)
+        while remaining:
+            # The earliest-idle device runs its own next job or steals one
+            for dev_idx in sorted(range(len(devices)), key=lambda d: loads[d]):
+                job = self._next_job(dev_idx, queues, eligible, costs)
+                if job is not None:
+                    break
+            placement[job] = dev_idx
+            loads[dev_idx] += costs[job] / self._speed(devices[dev_idx])
+            remaining -= 1
+        return placement
+
+    @staticmethod
+    def _next_job(dev_idx, queues, eligible, costs):
+        if queues[dev_idx]:
+            return queues[dev_idx].popleft()
+        victims = sorted(
+            (q for q in queues if q),
+            key=lambda q: -sum(costs[j] for j in q),
+        )
+        for victim in victims:
+            for pos in range(len(victim) - 1, -1, -1):
+                if dev_idx in eligible[victim[pos]]:
+                    job = victim[pos]
+                    del victim[pos]
+                    return job
+        return None
@@ -0,0 +1,216 @@
+"""Content-addressed cache of simulated circuit results.
+
+Circuits are identified by a SHA-256 fingerprint of their recorded
+``operations`` (the content digest of every :class:`quantum.ir.Instruction`)
+together with the class and parameters of the noise model.  Circuits whose
+state the operations no longer determine, after a measurement collapse or a
+direct assignment of ``state``, are identified by their amplitudes as well.
+A cache entry keeps the final state vector and its cumulative outcome
+distribution, so repeated submissions of the same circuit are answered by
+sampling the stored distribution instead of simulating again.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from ..circuit import QuantumCircuit
+from ..ir import Instruction
+from ..measurement import cumulative_distribution, sample_indices, format_bitstrings
+
+
+def _update(digest, value):
+    """Feed ``value`` into ``digest`` in a type-tagged canonical form."""
+    if isinstance(value, Instruction):
+        digest.update(value.digest())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"a{value.dtype.str}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"l{len(value)}".encode())
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, np.generic):
+        _update(digest, value.item())
+    elif isinstance(value, dict):
+        digest.update(f"d{len(value)}".encode())
+        for key in sorted(value):
+            _update(digest, key)
+            _update(digest, value[key])
+    else:
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def fingerprint(circuit, noise_model=None) -> str:
+    """Return the hex digest identifying ``circuit`` under ``noise_model``.
+
+    The operations are taken to act on ``|0...0>``.  When the circuit's
+    ``tracked`` flag is cleared, the current state vector is hashed too.
+    """
+    digest = hashlib.sha256()
+    _update(digest, circuit.num_qubits)
+    _update(digest, circuit.operations)
+    if not getattr(circuit, "tracked", True):
+        _update(digest, np.asarray(circuit.statevector(), dtype=complex))
+    if noise_model is not None:
+        _update(digest, type(noise_model).__qualname__)
+        _update(digest, vars(noise_model))
+    return digest.hexdigest()
+
+
+class CacheEntry:
+    """Final state and cumulative distribution of one cached circuit."""
+
+    __slots__ = ("state", "cdf")
+
+    def __init__(self, state, cdf):
+        self.state = state
+        self.cdf = cdf
+
+    @property
+    def nbytes(self) -> int:
+        return self.state.nbytes + self.cdf.nbytes
+
+    def probabilities(self):
+        """Return the basis-state probabilities."""
+        return np.diff(self.cdf, prepend=0.0)
+
+    def sample(self, shots, seed=None):
+        """Return a ``{bitstring: count}`` histogram of ``shots`` samples."""
+        rng = None if seed is None else np.random.default_rng(seed)
+        values, counts = np.unique(sample_indices(self.cdf, shots, rng), return_counts=True)
+        width = int(np.log2(len(self.cdf)))
+        return dict(zip(format_bitstrings(values, width), counts.tolist()))
+
+    def measure_all(self):
+        """Return one bitstring drawn with the global NumPy random state."""
+        return next(iter(self.sample(1)))
+
+
+class ResultCache:
+    """Thread-safe LRU cache of circuit results bounded by memory size.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Upper bound on the bytes held in memory; least recently used entries
+        are evicted first.  An entry larger than the bound is not kept in
+        memory.
+    path : str, optional
+        Directory for on-disk persistence.  Every stored entry is also
+        written there as ``<fingerprint>.npz`` and is reloaded on a memory
+        miss, so the cache survives restarts and is shared between worker
+        processes.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2 ** 20, path=None):
+        self.max_bytes = max_bytes
+        self.path = path
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        # Worker processes get an empty cache sharing only the disk store
+        state = self.__dict__.copy()
+        state.update(_entries=OrderedDict(), _lock=None, nbytes=0)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and memory usage."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+        }
+
+    def clear(self):
+        """Drop all in-memory entries; files on disk are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.npz")
+
+    def _insert(self, key, entry):
+        if entry.nbytes > self.max_bytes:
+            return
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key).nbytes
+        self._entries[key] = entry
+        self.nbytes += entry.nbytes
+        while self.nbytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.nbytes -= old.nbytes
+            self.evictions += 1
+
+    def get(self, key):
+        """Return the :class:`CacheEntry` for ``key`` or ``None`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if self.path is not None and os.path.exists(self._file(key)):
+                with np.load(self._file(key)) as data:
+                    entry = CacheEntry(data["state"], data["cdf"])
+                self._insert(key, entry)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def put(self, key, state):
+        """Store the final ``state`` under ``key`` and return its entry."""
+        state = np.array(state, dtype=complex)
+        entry = CacheEntry(state, cumulative_distribution(np.abs(state) ** 2))
+        with self._lock:
+            self._insert(key, entry)
+        if self.path is not None:
+            # Write to a temporary name first so readers never see partial files
+            tmp = self._file(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "wb") as handle:
+                np.savez(handle, state=entry.state, cdf=entry.cdf)
+            os.replace(tmp, self._file(key))
+        return entry
+
+    def lookup(self, circuit, noise_model=None):
+        """Return the cached entry for ``circuit``, simulating it on a miss.
+
+        On a miss ``noise_model`` is applied to a copy of ``circuit``, as a
+        device would, and the resulting state is stored.  ``circuit`` itself
+        is left unmodified either way.
+        """
+        key = fingerprint(circuit, noise_model)
+        entry = self.get(key)
+        if entry is None:
+            state = circuit.statevector()
+            if noise_model is not None:
+                noisy = QuantumCircuit(circuit.num_qubits, precision=circuit.dtype)
+                noisy.state = np.array(state, dtype=circuit.dtype)
+                noisy.operations = list(circuit.operations)
+                noise_model.apply(noisy)
+                state = noisy.statevector()
+            entry = self.put(key, state)
+        return entry
@@ -1,13 +1,88 @@
 """Distributed quantum resource orchestrator."""
 
+import asyncio
+import functools
+import inspect
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ..circuit import QuantumCircuit
+
+
+def _execute(device, circuit, shots=None, seed=None):
+    if shots is None:
+        return device.execute(circuit)
+    return device.execute(circuit, shots=shots, seed=seed)
+
+
+def _execute_shared(device, block, offset, num_qubits, dtype, operations, tracked, shots, seed):
+    """Worker entry point: rebuild a circuit from a shared state buffer.
+
+    Only the block name and offset of the state travel through the pickle
+    channel; the amplitudes are copied straight out of shared memory.
+    """
+    shm = shared_memory.SharedMemory(name=block)
+    try:
+        view = np.ndarray(2 ** num_qubits, dtype=dtype, buffer=shm.buf, offset=offset)
+        state = view.copy()
+        del view
+    finally:
+        shm.close()
+    # Forked workers inherit the parent's global RNG state; reseed per task
+    np.random.seed(seed.generate_state(4))
+    circuit = QuantumCircuit(num_qubits, precision=dtype)
+    circuit.state = state
+    circuit.operations = operations
+    circuit.tracked = tracked
+    return _execute(device, circuit, shots, seed)
+
+
+def _detached(circuit):
+    """Return a copy of ``circuit`` sharing only its operation list."""
+    copy = QuantumCircuit(circuit.num_qubits, precision=circuit.dtype)
+    copy.state = np.array(circuit.statevector(), dtype=circuit.dtype)
+    copy.operations = circuit.operations
+    copy.tracked = circuit.tracked
+    return copy
+
+
+def _split_shots(shots, parts):
+    """Split ``shots`` into at most ``parts`` near-equal positive chunks."""
+    parts = max(1, min(parts, shots))
+    return [shots // parts + (i < shots % parts) for i in range(parts)]
+
+
 class QuantumOrchestrator:
-    """Coordinate execution across heterogeneous quantum devices."""
+    """Coordinate execution across heterogeneous quantum devices.
 
-    def __init__(self):
+    Parameters
+    ----------
+    max_in_flight : int, optional
+        Default limit on concurrently executing asynchronous jobs per device
+        (see :meth:`submit`).  A device may override it with its own
+        ``max_in_flight`` attribute.  Unbounded when ``None``.
+    cache : ResultCache, optional
+        Result cache handed to registered devices that accept one but were
+        created without their own.
+    """
+
+    def __init__(self, max_in_flight=None, cache=None):
         self.devices = []
+        self.max_in_flight = max_in_flight
+        self.cache = cache
+        self._jobs = set()
+        self._queued = Counter()
+        self._limits = {}
+        self._loop = None
 
     def register_device(self, device):
         """Register a quantum processing unit."""
+        if self.cache is not None and getattr(device, "cache", False) is None:
+            device.cache = self.cache
         self.devices.append(device)
 
     def run(self, circuit):
@@ -23,7 +98,119 @@ class QuantumOrchestrator:
             return device.execute(circuit)
         return circuit.measure_all()
 
-    def run_batch(self, circuits, scheduler=None, max_workers=None):
+    def _limit(self, index):
+        """Return the in-flight semaphore of device ``index`` for the running loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores are bound to the loop that first uses them
+            self._loop = loop
+            self._limits = {}
+        if index not in self._limits:
+            limit = getattr(self.devices[index], "max_in_flight", None) or self.max_in_flight
+            self._limits[index] = asyncio.Semaphore(limit) if limit else None
+        return self._limits[index]
+
+    def _pick_device(self):
+        """Return the index of the device with the fewest waiting and running jobs."""
+        return min(
+            range(len(self.devices)),
+            key=lambda i: (self._queued[i], getattr(self.devices[i], "noise_level", 0)),
+        )
+
+    async def _run_job(self, index, circuit, shots, seed):
+        device = self.devices[index]
+        limit = self._limit(index)
+        if limit is not None:
+            await limit.acquire()
+        execute_async = getattr(device, "execute_async", None)
+        if execute_async is not None and inspect.iscoroutinefunction(execute_async):
+            try:
+                if shots is None:
+                    return await execute_async(circuit)
+                return await execute_async(circuit, shots=shots, seed=seed)
+            finally:
+                if limit is not None:
+                    limit.release()
+        # Synchronous devices run in the default thread pool.  Cancelling the
+        # job cannot stop the worker thread, so the slot is only released once
+        # the call has returned.
+        call = functools.partial(_execute, device, circuit, shots, seed)
+        future = asyncio.get_running_loop().run_in_executor(None, call)
+
+        def release(finished):
+            if limit is not None:
+                limit.release()
+            if not finished.cancelled():
+                finished.exception()  # mark as retrieved if the job was withdrawn
+
+        future.add_done_callback(release)
+        return await asyncio.shield(future)
+
+    def submit(self, circuit, device=None, shots=None, seed=None):
+        """Schedule ``circuit`` for asynchronous execution.
+
+        Must be called from a running event loop.  The job waits for a free
+        slot on its device, so at most ``max_in_flight`` jobs execute on a
+        device at once while further submissions queue up.  Devices providing
+        an ``async def execute_async`` are awaited directly; devices with only
+        a synchronous ``execute`` run in the loop's default executor.
+
+        Parameters
+        ----------
+        circuit : QuantumCircuit
+            Circuit to execute.
+        device : int, optional
+            Index of the target device; the least congested device is chosen
+            when omitted.
+        shots, seed : int, optional
+            Forwarded to the device as in :meth:`run_batch`.
+
+        Returns
+        -------
+        asyncio.Task
+            Awaitable resolving to the measurement result.  Call ``cancel()``
+            to withdraw a job; a job already running on a synchronous device
+            finishes in the background, keeping its device slot until then,
+            and its result is discarded.
+        """
+        if not self.devices:
+            raise RuntimeError("no devices registered")
+        index = self._pick_device() if device is None else device
+        task = asyncio.get_running_loop().create_task(
+            self._run_job(index, circuit, shots, seed)
+        )
+        self._jobs.add(task)
+        self._queued[index] += 1
+
+        def done(finished):
+            self._jobs.discard(finished)
+            self._queued[index] -= 1
+
+        task.add_done_callback(done)
+        return task
+
+    async def as_completed(self, jobs=None):
+        """Yield job results in completion order.
+
+        ``jobs`` defaults to every pending job of this orchestrator.
+        Cancelled jobs are skipped.
+        """
+        pending = set(self._jobs if jobs is None else jobs)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for job in done:
+                if not job.cancelled():
+                    yield job.result()
+
+    def cancel_all(self):
+        """Cancel every pending job and return how many were cancelled."""
+        pending = [task for task in self._jobs if not task.done()]
+        for task in pending:
+            task.cancel()
+        return len(pending)
+
+    def run_batch(self, circuits, scheduler=None, max_workers=None, executor="thread",
+                  shots=None, seed=None):
         """Execute ``circuits`` in parallel across registered devices.
 
         Parameters
@@ -32,45 +219,128 @@ class QuantumOrchestrator:
             Circuits to execute.
         scheduler : Scheduler, optional
             Scheduler providing a mapping of circuits to devices.  If ``None``
-            a default noise-aware scheduler is used.
+            a default noise-aware scheduler costing ``shots`` is used.
         max_workers : int, optional
-            Maximum number of worker threads.
+            Maximum number of worker threads or processes.
+        executor : {"thread", "process"}
+            ``"thread"`` runs devices in a thread pool on the original
+            circuits (on copies when ``shots`` is given).  ``"process"``
+            sidesteps the GIL with a process pool: final state vectors are
+            written once into a shared-memory block and workers receive only
+            the block offset and the operation list, so devices must be
+            picklable.  Circuits are not modified in this mode.
+        shots : int, optional
+            When given, each circuit is sampled ``shots`` times through
+            ``device.execute(circuit, shots=..., seed=...)``.  The shots are
+            split across the workers and the partial histograms are merged.
+        seed : int, optional
+            Seed for the per-task random streams.
 
         Returns
         -------
-        list[str]
-            Measurement results for each circuit.
+        list[str] or list[dict[str, int]]
+            Measurement results for each circuit, or one ``{bitstring: count}``
+            histogram per circuit when ``shots`` is given.
         """
+        if executor not in ("thread", "process"):
+            raise ValueError("executor must be 'thread' or 'process'")
         if not self.devices:
-            return [c.measure_all() for c in circuits]
+            if shots is None:
+                return [c.measure_all() for c in circuits]
+            return [c.sample(shots, seed=seed) for c in circuits]
 
         from .advanced_scheduling import Scheduler
-        scheduler = scheduler or Scheduler()
+        scheduler = scheduler or Scheduler(shots=shots)
         schedule = scheduler.schedule(circuits, self.devices)
 
-        results = [None] * len(schedule)
+        if executor == "thread":
+            workers = max_workers or len(self.devices)
+        else:
+            workers = max_workers or os.cpu_count() or 1
+        # One task per (circuit, shot chunk); a single task per circuit without shots
+        tasks = []
+        for i, (idx, circ) in enumerate(schedule):
+            for chunk in [None] if shots is None else _split_shots(shots, workers):
+                tasks.append((i, idx, circ, chunk))
+        seeds = np.random.SeedSequence(seed).spawn(len(tasks))
 
-        def execute(dev, circ):
-            return dev.execute(circ)
+        if executor == "thread":
+            with ThreadPoolExecutor(max_workers=workers) as exe:
+                futures = [
+                    exe.submit(_execute, self.devices[idx], circ, None)
+                    if chunk is None else
+                    exe.submit(_execute, self.devices[idx], _detached(circ), chunk, task_seed)
+                    for (_, idx, circ, chunk), task_seed in zip(tasks, seeds)
+                ]
+                outputs = [fut.result() for fut in futures]
+        else:
+            outputs = self._run_processes(schedule, tasks, seeds, workers)
 
-        from concurrent.futures import ThreadPoolExecutor
+        if shots is None:
+            return outputs
+        merged = [Counter() for _ in schedule]
+        for (i, _, _, _), counts in zip(tasks, outputs):
+            merged[i].update(counts)
+        return [dict(sorted(counts.items())) for counts in merged]
 
-        with ThreadPoolExecutor(max_workers=max_workers or len(self.devices)) as exe:
-            futures = [exe.submit(execute, self.devices[idx], circ) for idx, circ in schedule]
-            for i, fut in enumerate(futures):
-                results[i] = fut.result()
-
-        return results
+    def _run_processes(self, schedule, tasks, seeds, workers):
+        """Run ``tasks`` in a process pool, sharing final states through memory."""
+        offsets = {}
+        size = 0
+        for _, circ in schedule:
+            if id(circ) not in offsets:
+                offsets[id(circ)] = size
+                size += 2 ** circ.num_qubits * circ.dtype.itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            for _, circ in schedule:
+                state = np.asarray(circ.statevector(), dtype=circ.dtype)
+                buffer = np.ndarray(state.shape, dtype=circ.dtype, buffer=shm.buf,
+                                    offset=offsets[id(circ)])
+                buffer[...] = state
+                del buffer
+            with ProcessPoolExecutor(max_workers=workers) as exe:
+                futures = [
+                    exe.submit(_execute_shared, self.devices[idx], shm.name,
+                               offsets[id(circ)], circ.num_qubits, circ.dtype.str,
+                               circ.operations, circ.tracked, chunk, task_seed)
+                    for (_, idx, circ, chunk), task_seed in zip(tasks, seeds)
+                ]
+                return [fut.result() for fut in futures]
+        finally:
+            shm.close()
+            shm.unlink()
 
 
 class SimulatedDevice:
-    """Minimal device executing circuits inside the current process."""
+    """Minimal device executing circuits inside the current process.
+
+    ``speed`` and ``max_qubits`` describe the device to the cost-model
+    strategies of :class:`Scheduler`.  With a :class:`ResultCache`, circuits
+    already seen under the same noise model are sampled from the cached
+    distribution, and submitted circuits are never modified: on a miss the
+    noise is applied to a copy.
+    """
 
-    def __init__(self, noise_model=None, noise_level: float = 0.0):
+    def __init__(self, noise_model=None, noise_level: float = 0.0, speed: float = 1.0,
+                 max_qubits=None, cache=None):
         self.noise_model = noise_model
         self.noise_level = noise_level
+        self.speed = speed
+        self.max_qubits = max_qubits
+        self.cache = cache
+
+    def execute(self, circuit, shots=None, seed=None):
+        """Apply the device noise and measure ``circuit``.
 
-    def execute(self, circuit):
+        Returns one bitstring, or a ``{bitstring: count}`` histogram of
+        ``shots`` samples when ``shots`` is given.
+        """
+        if self.cache is not None:
+            entry = self.cache.lookup(circuit, self.noise_model)
+            return entry.measure_all() if shots is None else entry.sample(shots, seed)
         if self.noise_model is not None:
             self.noise_model.apply(circuit)
-        return circuit.measure_all()
+        if shots is None:
+            return circuit.measure_all()
+        return circuit.sample(shots, seed=seed)
@@ -0,0 +1,408 @@
+"""State-vector simulation sharded across worker processes.
+
+:class:`ShardedCircuit` splits the ``2^n`` amplitudes into ``2^k`` shards by
+the value of the ``k`` leading ("global") qubits.  Each shard is owned by
+one worker process.  The shards are contiguous slices of a single
+:mod:`multiprocessing.shared_memory` block, so no amplitudes are pickled.
+The remaining ``n - k`` qubits are local: a gate on them runs independently
+in every shard with the in-place kernels of :mod:`quantum.kernels`.
+
+Gates on global qubits are handled without gathering the state:
+
+* diagonal single-qubit gates only rescale whole shards;
+* a controlled gate with a global control runs on the shards where the
+  control is ``1``;
+* any other gate first swaps the global qubit with a local one.  Shards
+  differing only in that global qubit exchange the halves of their
+  amplitudes whose local bit differs, and a qubit layout remembers the new
+  position.  The caller always sees qubits in their original order.
+
+Local gates are batched and sent to the workers together, so each
+synchronization costs one message round trip per worker.
+"""
+
+import multiprocessing
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ..gates import classify, DIAGONAL
+from ..ir import Instruction, GATE, TWO_QUBIT, CONTROLLED, UNITARY, PHASE_ORACLE, DIFFUSION
+from ..kernels import (
+    apply_1q_inplace,
+    apply_2q_inplace,
+    apply_controlled_inplace,
+    single_qubit_views,
+    default_workspace,
+)
+from ..measurement import (
+    marginalize,
+    cumulative_distribution,
+    sample_indices,
+    format_bitstrings,
+)
+from ..pauli import PauliSum
+from ..precision import resolve_dtype
+
+
+def _shard_bit(shard, axis, k):
+    """Return the value of global axis ``axis`` in shard index ``shard``."""
+    return (shard >> (k - 1 - axis)) & 1
+
+
+def _worker(block, dtype, num_qubits, k, shard, conn):
+    """Worker loop owning shard ``shard`` of the shared state ``block``."""
+    shm = shared_memory.SharedMemory(name=block)
+    state = np.ndarray(2 ** num_qubits, dtype=dtype, buffer=shm.buf)
+    local_n = num_qubits - k
+    length = 2 ** local_n
+    local = state[shard * length:(shard + 1) * length]
+    try:
+        while True:
+            command, args = conn.recv()
+            result = None
+            if command == "ops":
+                for op in args:
+                    _apply_local(local, local_n, shard, k, op)
+            elif command == "swap":
+                _exchange(state, shard, k, *args)
+            elif command == "oracle":
+                np.negative(local, out=local, where=args)
+            elif command == "sum":
+                result = local.sum(dtype=complex)
+            elif command == "reflect":
+                np.negative(local, out=local)
+                local += args
+            elif command == "close":
+                conn.send(None)
+                break
+            conn.send(result)
+    finally:
+        del local, state
+        shm.close()
+        conn.close()
+
+
+def _exchange(state, shard, k, axis, qubit):
+    """Swap global ``axis`` with local ``qubit`` between a pair of shards.
+
+    The shard with a ``0`` on ``axis`` trades its ``qubit = 1`` half for the
+    ``qubit = 0`` half of its partner; the partner itself does nothing.
+    """
+    if _shard_bit(shard, axis, k):
+        return
+    local_n = state.size.bit_length() - 1 - k
+    length = 2 ** local_n
+    partner = shard | (1 << (k - 1 - axis))
+    _, mine = single_qubit_views(state[shard * length:(shard + 1) * length], qubit, local_n)
+    theirs, _ = single_qubit_views(state[partner * length:(partner + 1) * length], qubit, local_n)
+    tmp = default_workspace().scratch(mine.size, state.dtype).reshape(mine.shape)
+    tmp[...] = mine
+    mine[...] = theirs
+    theirs[...] = tmp
+
+
+def _apply_local(local, local_n, shard, k, op):
+    kind, matrix, qubits, condition = op
+    if condition is not None:
+        axis, bit = condition
+        if _shard_bit(shard, axis, k) != bit:
+            return
+    if kind == GATE:
+        apply_1q_inplace(local, matrix, qubits[0], local_n)
+    elif kind == TWO_QUBIT:
+        apply_2q_inplace(local, matrix, qubits[0], qubits[1], local_n)
+    elif kind == CONTROLLED:
+        apply_controlled_inplace(local, matrix, qubits[0], qubits[1], local_n)
+    else:
+        # Diagonal entry ``matrix`` scales the whole shard
+        local *= matrix
+
+
+def _shutdown(processes, pipes, shm):
+    for conn in pipes:
+        try:
+            conn.send(("close", None))
+            conn.recv()
+        except (BrokenPipeError, EOFError, OSError):
+            pass
+        conn.close()
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+    shm.close()
+    shm.unlink()
+
+
+class ShardedCircuit:
+    """State-vector simulator distributed over ``2^k`` worker processes.
+
+    Parameters
+    ----------
+    num_qubits : int
+        Number of qubits in the register.
+    global_qubits : int
+        Number ``k`` of leading qubits used to select a shard; ``2^k``
+        workers are started.  At least two qubits must stay local.
+    precision : {"single", "double"} or dtype, optional
+        Precision of the amplitudes; the global default when omitted.
+    start_method : str, optional
+        :mod:`multiprocessing` start method of the workers.
+
+    Qubit ``q`` and the ``tracked`` flag follow the conventions of
+    :class:`quantum.QuantumCircuit`.  Call :meth:`close` (or use the circuit
+    as a context manager) to stop the workers and free the shared memory.
+    """
+
+    def __init__(self, num_qubits: int, global_qubits: int = 1, precision=None,
+                 start_method=None):
+        if not 0 <= global_qubits <= num_qubits - 2:
+            raise ValueError("global_qubits must leave at least two local qubits")
+        self.num_qubits = num_qubits
+        self.global_qubits = global_qubits
+        self.dtype = resolve_dtype(precision)
+        self.operations = []
+        self.tracked = True
+        # layout[q] is the physical axis holding logical qubit q
+        self.layout = list(range(num_qubits))
+        self._last_use = [0] * num_qubits
+        self._clock = 0
+        self._pending = []
+
+        dim = 2 ** num_qubits
+        self._shm = shared_memory.SharedMemory(create=True, size=dim * self.dtype.itemsize)
+        self._data = np.ndarray(dim, dtype=self.dtype, buffer=self._shm.buf)
+        self._data[:] = 0
+        self._data[0] = 1
+
+        context = multiprocessing.get_context(start_method)
+        self._pipes = []
+        self._processes = []
+        for shard in range(self.num_shards):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(self._shm.name, self.dtype.str, num_qubits, global_qubits, shard, child),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+        self._finalizer = weakref.finalize(
+            self, _shutdown, self._processes, self._pipes, self._shm
+        )
+
+    @property
+    def num_shards(self) -> int:
+        return 2 ** self.global_qubits
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        self._data = None
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _broadcast(self, command, args=None):
+        """Send the same ``command`` to every worker and return their replies."""
+        return self._scatter(command, [args] * self.num_shards)
+
+    def _scatter(self, command, messages):
+        """Send ``(command, messages[s])`` to worker ``s`` and return the replies."""
+        for conn, message in zip(self._pipes, messages):
+            conn.send((command, message))
+        return [conn.recv() for conn in self._pipes]
+
+    def flush(self):
+        """Run all batched local gates in the workers."""
+        if self._pending:
+            pending, self._pending = self._pending, []
+            self._broadcast("ops", pending)
+
+    def _is_global(self, q):
+        return self.layout[q] < self.global_qubits
+
+    def _touch(self, qubits):
+        self._clock += 1
+        for q in qubits:
+            self._last_use[q] = self._clock
+
+    def _localize(self, q, keep):
+        """Swap logical qubit ``q`` into a local axis, avoiding qubits ``keep``."""
+        if not self._is_global(q):
+            return
+        candidates = [
+            p for p in range(self.num_qubits)
+            if not self._is_global(p) and p not in keep
+        ]
+        # Evict the local qubit that has waited longest since it was used
+        other = min(candidates, key=lambda p: self._last_use[p])
+        axis, local_axis = self.layout[q], self.layout[other]
+        self.flush()
+        self._broadcast("swap", (axis, local_axis - self.global_qubits))
+        self.layout[q], self.layout[other] = local_axis, axis
+
+    def _local(self, q):
+        return self.layout[q] - self.global_qubits
+
+    def _queue(self, kind, matrix, qubits, condition=None):
+        self._pending.append((kind, matrix, tuple(qubits), condition))
+
+    def _check(self, qubits):
+        for q in qubits:
+            if not 0 <= q < self.num_qubits:
+                raise ValueError(f"qubit {q} out of range for {self.num_qubits} qubits")
+
+    def apply_gate(self, gate, qubits):
+        """Apply a single-qubit gate to the specified qubits."""
+        qubits = list(qubits)
+        self._check(qubits)
+        gate = np.asarray(gate)
+        diagonal = classify(gate) == DIAGONAL
+        for q in qubits:
+            self._touch([q])
+            if self._is_global(q) and diagonal:
+                axis = self.layout[q]
+                for bit in (0, 1):
+                    if gate[bit, bit] != 1:
+                        self._queue(None, complex(gate[bit, bit]), (), (axis, bit))
+                continue
+            self._localize(q, ())
+            self._queue(GATE, gate, (self._local(q),))
+        self.operations.append(Instruction(GATE, qubits, gate))
+
+    def apply_two_qubit_gate(self, gate, control, target):
+        """Apply a 4x4 gate to ``(control, target)``."""
+        if control == target:
+            raise ValueError("control and target must be different")
+        self._check((control, target))
+        self._touch((control, target))
+        self._localize(control, (target,))
+        self._localize(target, (control,))
+        self._queue(TWO_QUBIT, np.asarray(gate), (self._local(control), self._local(target)))
+        self.operations.append(Instruction(TWO_QUBIT, (control, target), gate))
+
+    def apply_controlled_gate(self, gate, control, target):
+        """Apply a controlled single-qubit gate."""
+        if control == target:
+            raise ValueError("control and target must be different")
+        self._check((control, target))
+        self._touch((control, target))
+        self._localize(target, (control,))
+        gate = np.asarray(gate)
+        if self._is_global(control):
+            # Only shards where the control reads 1 apply the gate
+            self._queue(GATE, gate, (self._local(target),), (self.layout[control], 1))
+        else:
+            self._queue(CONTROLLED, gate, (self._local(control), self._local(target)))
+        self.operations.append(Instruction(CONTROLLED, (control, target), gate))
+
+    def apply_unitary(self, unitary):
+        """Apply a full unitary matrix; this gathers the state in the caller."""
+        self._replace_state(np.asarray(unitary) @ self.state)
+        self.operations.append(Instruction(UNITARY, (), unitary))
+
+    def apply_phase_oracle(self, mask):
+        """Flip the sign of every amplitude whose index is marked in ``mask``."""
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (2 ** self.num_qubits,):
+            raise ValueError("mask dimension mismatch")
+        self.flush()
+        shards = np.array_split(self._to_physical(mask), self.num_shards)
+        self._scatter("oracle", shards)
+        self.operations.append(Instruction(PHASE_ORACLE, (), mask))
+
+    def apply_diffusion(self):
+        """Reflect the state about the uniform superposition."""
+        self.flush()
+        mean = sum(self._broadcast("sum")) / 2 ** self.num_qubits
+        self._broadcast("reflect", 2 * mean)
+        self.operations.append(Instruction(DIFFUSION))
+
+    def _to_physical(self, values):
+        """Reorder a logically indexed vector into the physical layout."""
+        n = self.num_qubits
+        return np.transpose(values.reshape([2] * n), np.argsort(self.layout)).reshape(-1)
+
+    def _to_logical(self, values):
+        n = self.num_qubits
+        return np.transpose(values.reshape([2] * n), self.layout).reshape(-1)
+
+    @property
+    def state(self):
+        """Copy of the full state vector in logical qubit order."""
+        self.flush()
+        return self._to_logical(self._data).copy()
+
+    @state.setter
+    def state(self, value):
+        self._replace_state(value)
+        self.tracked = False
+
+    def statevector(self):
+        """Return the full state vector in logical qubit order."""
+        return self.state
+
+    def _replace_state(self, value):
+        value = np.asarray(value)
+        if value.shape != (2 ** self.num_qubits,):
+            raise ValueError("state dimension mismatch")
+        self._pending = []
+        self._data[:] = self._to_physical(value)
+
+    def probabilities(self):
+        """Return the probability of each computational basis state."""
+        self.flush()
+        return self._to_logical(np.square(np.abs(self._data), dtype=np.float64))
+
+    def marginal_probabilities(self, qubits):
+        """Return the outcome distribution of measuring ``qubits``.
+
+        Uses the qubit convention of :meth:`QuantumCircuit.measure_qubits`.
+        """
+        return marginalize(self.probabilities(), qubits, self.num_qubits)
+
+    def expectation(self, observable) -> complex:
+        """Return the expectation value of a dense matrix or ``PauliSum``."""
+        state = self.state.astype(complex, copy=False)
+        if isinstance(observable, PauliSum):
+            return observable.expectation(state)
+        if observable.shape != (2 ** self.num_qubits, 2 ** self.num_qubits):
+            raise ValueError("observable dimension mismatch")
+        return np.vdot(state, observable @ state)
+
+    def sample(self, shots, seed=None):
+        """Return a ``{bitstring: count}`` histogram over the full register."""
+        rng = np.random.default_rng(seed) if seed is not None else None
+        cdf = cumulative_distribution(self.probabilities())
+        values, counts = np.unique(sample_indices(cdf, shots, rng), return_counts=True)
+        return dict(zip(format_bitstrings(values, self.num_qubits), counts.tolist()))
+
+    def measure_all(self):
+        """Return a bitstring measurement of the entire register."""
+        return next(iter(self.sample(1)))
+
+    def measure_qubits(self, qubits):
+        """Measure ``qubits``, collapse the state and return the outcome.
+
+        Follows the conventions of :meth:`QuantumCircuit.measure_qubits`.
+        """
+        qubits = list(qubits)
+        n = self.num_qubits
+        probs = self.marginal_probabilities(qubits)
+        outcome = np.random.choice(len(probs), p=probs / probs.sum())
+        tensor = self._data.reshape([2] * n)
+        for i, q in enumerate(qubits):
+            # Bit ``q`` of a basis index is logical axis ``n - 1 - q``
+            axis = self.layout[n - 1 - q]
+            tensor[(slice(None),) * axis + (1 - ((outcome >> i) & 1),)] = 0
+        self._data /= np.sqrt(np.sum(np.square(np.abs(self._data), dtype=np.float64)))
+        self.tracked = False
+        return "".join(str((outcome >> i) & 1) for i in range(len(qubits)))
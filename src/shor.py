@@ -1,49 +1,161 @@
 """Simplified Shor's factoring algorithm built on the quantum circuit utilities."""
 
 import numpy as np
-from math import gcd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fractions import Fraction
+from functools import lru_cache
+from math import gcd, lcm
 
 from quantum import H, QuantumCircuit
-from quantum.transform import apply_inverse_qft, qft
+from quantum.transform import apply_qft
 from quantum.circuit import tensor
 
 
+def modexp_table(a, N, num_bits):
+    """Return ``pow(a, x, N)`` for every ``x`` in ``range(2 ** num_bits)``.
+
+    The table is filled by doubling: the upper half of each prefix is the
+    lower half multiplied by ``a ** (2 ** k) mod N``.
+    """
+    table = np.empty(2 ** num_bits, dtype=np.int64)
+    table[0] = 1 % N
+    factor = a % N
+    for k in range(num_bits):
+        size = 2 ** k
+        table[size:2 * size] = (table[:size] * factor) % N
+        factor = (factor * factor) % N
+    return table
+
+
+@lru_cache(maxsize=64)
+def modexp_permutation(a, N, n):
+    """Return destination indices of the modular exponentiation map.
+
+    Basis state ``|x>|aux>`` (``x`` in the upper ``n`` bits) is sent to
+    ``|x>|(aux + a^x mod N) mod N>``.  Tables are cached per ``(a, N, n)`` so
+    repeated calls for the same modulus reuse them.
+    """
+    x = np.arange(2 ** n, dtype=np.int64)
+    aux = np.arange(2 ** n, dtype=np.int64)
+    dest = (x[:, None] << n) | ((aux[None, :] + modexp_table(a, N, n)[:, None]) % N)
+    dest = dest.reshape(-1)
+    dest.setflags(write=False)
+    return dest
+
+
 def apply_controlled_modexp(state, a, N, n, exponent):
     """Controlled modular exponentiation on the lower n qubits.
 
     This placeholder applies classical modular exponentiation to each basis
     state. A full implementation would require a reversible quantum modular
-    exponentiation circuit."""
-    new_state = np.zeros_like(state)
-    for idx, amplitude in enumerate(state):
-        if amplitude == 0:
-            continue
-        binary = np.array(list(np.binary_repr(idx, width=2 * n)), dtype=int)
-        x_bits = binary[:n]
-        aux_bits = binary[n:]
-        x = int("".join(x_bits.astype(str)), 2)
-        aux = int("".join(aux_bits.astype(str)), 2)
-        result = pow(a, x, N)
-        if exponent:
-            aux = (aux + result) % N
-        new_index = int(
-            "".join(
-                np.concatenate([
-                    x_bits,
-                    np.array(list(np.binary_repr(aux, width=n)), dtype=int),
-                ]).astype(str)
-            ),
-            2,
-        )
-        new_state[new_index] += amplitude
+    exponentiation circuit.  The map is applied as a single scatter-add over a
+    cached index table, because auxiliary values ``>= N`` can collide.
+    """
+    if not exponent:
+        return state.copy()
+    dest = modexp_permutation(a, N, n)
+    size = len(state)
+    new_state = np.bincount(dest, weights=state.real, minlength=size).astype(complex)
+    new_state.imag = np.bincount(dest, weights=state.imag, minlength=size)
     return new_state
 
 
-def period_finding(a, N):
-    """Use the order finding routine to compute period r such that a^r ≡ 1 mod N."""
+# Multiples of a convergent denominator tried in case the numerator shared a
+# factor with the period
+_MAX_MULTIPLE = 4
+
+
+def recover_period(a, N, measurement, num_bits):
+    """Return the order of ``a`` mod ``N`` suggested by ``measurement``.
+
+    The phase ``measurement / 2**num_bits`` is expanded into continued
+    fraction convergents.  Each non-trivial denominator ``k < N`` is checked
+    classically with ``pow(a, r, N) == 1``, together with its multiples up
+    to :data:`_MAX_MULTIPLE` and its lcm with the previous denominator, in
+    case the numerator shared a factor with the period.  Returns ``None``
+    when the measured phase yields no period, so the measurement (rather
+    than a classical scan) determines the result.
+    """
+    phase = Fraction(int(measurement), 2 ** num_bits)
+    num, den = phase.numerator, phase.denominator
+    h_prev, h = 0, 1
+    k_prev, k = 1, 0
+    previous = None
+    tried = set()
+    while den:
+        q, rem = divmod(num, den)
+        h_prev, h = h, q * h + h_prev
+        k_prev, k = k, q * k + k_prev
+        if k >= N:
+            break
+        num, den = den, rem
+        # The first convergent of a phase below one is 0/1 and says nothing
+        if k <= 1:
+            continue
+        candidates = [k * m for m in range(1, _MAX_MULTIPLE + 1)]
+        if previous is not None:
+            candidates.append(lcm(previous, k))
+        for r in candidates:
+            if r < N and r not in tried:
+                tried.add(r)
+                if pow(a, r, N) == 1:
+                    return _minimal_order(a, N, r)
+        previous = k
+    return None
+
+
+def _minimal_order(a, N, r):
+    """Reduce a multiple ``r`` of the order of ``a`` mod ``N`` to the order."""
+    remaining, p = r, 2
+    while p * p <= remaining:
+        if remaining % p == 0:
+            while remaining % p == 0:
+                remaining //= p
+            while r % p == 0 and pow(a, r // p, N) == 1:
+                r //= p
+        p += 1
+    if remaining > 1 and pow(a, r // remaining, N) == 1:
+        r //= remaining
+    return r
+
+
+def first_register_distribution(a, N):
+    """Return the exact measurement distribution of the exponent register.
+
+    Instead of simulating the full ``2n``-qubit state, the exponent values
+    ``x`` are grouped by the auxiliary value they map to; each group is an
+    orthogonal branch whose inverse QFT is a single FFT over ``x``.
+    """
     n = int(np.ceil(np.log2(N))) * 2
-    qc = QuantumCircuit(2 * n)
+    aux = np.zeros(2 ** n, dtype=np.int64)
+    for i in range(n):
+        aux = (aux + modexp_table(pow(a, 2 ** i, N), N, n)) % N
+    _, branch = np.unique(aux, return_inverse=True)
+    indicator = np.zeros((2 ** n, branch.max() + 1), dtype=complex)
+    indicator[np.arange(2 ** n), branch] = 1 / np.sqrt(2 ** n)
+    amplitudes = np.fft.fft(indicator, axis=0, norm="ortho")
+    return (np.abs(amplitudes) ** 2).sum(axis=1)
+
+
+def period_finding(a, N, exact=False):
+    """Use the order finding routine to compute period r such that a^r ≡ 1 mod N.
+
+    With ``exact`` the first-register distribution is computed analytically by
+    :func:`first_register_distribution` and outcomes are tried from the most
+    to the least likely, so the search is deterministic and bounded.
+    """
+    n = int(np.ceil(np.log2(N))) * 2
+    if exact:
+        probabilities = first_register_distribution(a, N)
+        for measurement in np.argsort(-probabilities, kind="stable"):
+            if probabilities[measurement] < 1e-12:
+                break
+            r = recover_period(a, N, measurement, n)
+            if r is not None:
+                return r
+        return None
 
+    qc = QuantumCircuit(2 * n)
     # Apply Hadamard to the first n qubits
     for qubit in range(n):
         qc.apply_gate(H, [qubit])
@@ -54,39 +166,94 @@ def period_finding(a, N):
             qc.state, pow(a, 2 ** i, N), N, n, exponent=True
         )
 
-    # Apply inverse QFT to the first n qubits
-    qc.state = apply_inverse_qft(qc.state, n, 2 * n)
+    # Apply inverse QFT to the first n qubits.  The exponent register is
+    # stored most significant bit first, so qubit n - 1 is its lowest bit.
+    qc.state = apply_qft(qc.state, range(n - 1, -1, -1), 2 * n, inverse=True)
 
     # Measure the first register
-    probabilities = np.abs(qc.state) ** 2
+    probabilities = qc.statevector().reshape(2 ** n, -1)
+    probabilities = (np.abs(probabilities) ** 2).sum(axis=1)
     measurement = np.random.choice(len(probabilities), p=probabilities)
-    phase = measurement / (2 ** n)
-    for s in range(1, N):
-        if abs(phase - round(phase * s) / s) < 1 / (2 * (2 ** n)):
-            r = s
-            break
-    else:
-        r = None
-    return r
+    return recover_period(a, N, measurement, n)
+
 
+def perfect_power_root(N):
+    """Return ``b`` if ``N == b ** k`` for some ``k >= 2``, otherwise ``None``.
 
-def shor(N):
+    Shor's reduction cannot split prime powers, so they are handled
+    classically before any period finding.
+    """
+    for k in range(int(np.log2(N)), 1, -1):
+        b = round(N ** (1 / k))
+        for candidate in (b - 1, b, b + 1):
+            if candidate > 1 and candidate ** k == N:
+                return candidate
+    return None
+
+
+def factor_from_base(a, N, exact=False):
+    """Try to split ``N`` using base ``a``; return a factor or ``None``."""
+    g = gcd(a, N)
+    if g > 1:
+        return g
+    r = period_finding(a, N, exact=exact)
+    if r is None or r % 2 != 0:
+        return None
+    x = pow(a, r // 2, N)
+    if x == N - 1:
+        return None
+    factor = gcd(x + 1, N)
+    if factor not in [1, N]:
+        return factor
+    return None
+
+
+def shor(N, workers=None, exact=False, max_attempts=None):
+    """Return a non-trivial factor of ``N``.
+
+    Parameters
+    ----------
+    N : int
+        Composite number to factor.
+    workers : int, optional
+        When greater than one, that many candidate bases are evaluated
+        concurrently in a process pool and the first factor found wins.
+    exact : bool, optional
+        Use the analytic first-register distribution instead of simulating
+        and sampling the circuit (see :func:`period_finding`).
+    max_attempts : int, optional
+        Maximum number of bases to try before giving up and returning
+        ``None``.  Tries indefinitely when omitted.
+    """
     if N % 2 == 0:
         return 2
-    while True:
-        a = np.random.randint(2, N)
-        g = gcd(a, N)
-        if g > 1:
-            return g
-        r = period_finding(a, N)
-        if r is None or r % 2 != 0:
-            continue
-        x = pow(a, r // 2, N)
-        if x == N - 1:
-            continue
-        factor = gcd(x + 1, N)
-        if factor not in [1, N]:
-            return factor
+    root = perfect_power_root(N)
+    if root is not None:
+        return root
+
+    attempts = 0
+    if workers is None or workers <= 1:
+        while max_attempts is None or attempts < max_attempts:
+            attempts += 1
+            a = np.random.randint(2, N)
+            factor = factor_from_base(a, N, exact)
+            if factor is not None:
+                return factor
+        return None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while max_attempts is None or attempts < max_attempts:
+            batch = workers if max_attempts is None else min(workers, max_attempts - attempts)
+            attempts += batch
+            bases = np.random.randint(2, N, size=batch)
+            futures = [pool.submit(factor_from_base, int(a), N, exact) for a in bases]
+            for fut in as_completed(futures):
+                factor = fut.result()
+                if factor is not None:
+                    for other in futures:
+                        other.cancel()
+                    return factor
+    return None
 
 
 def main():
@@ -0,0 +1,36 @@
+"""Simulate large Clifford circuits on the stabilizer tableau backend."""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+
+from quantum import QuantumCircuit, StabilizerCircuit, H, CNOT, PauliSum
+from quantum.stabilizer import simulate
+
+
+def ghz(num_qubits):
+    """Prepare a GHZ state, far beyond the reach of a state vector."""
+    circuit = StabilizerCircuit(num_qubits)
+    circuit.apply_gate(H, [0])
+    for q in range(num_qubits - 1):
+        circuit.apply_two_qubit_gate(CNOT, q, q + 1)
+    return circuit
+
+
+def main():
+    circuit = ghz(1000)
+    counts = circuit.sample(100, seed=0)
+    print({key[:8] + "...": count for key, count in counts.items()})
+    print(f"<Z0 Z999> = {circuit.expectation(PauliSum([(1, 'Z' + 'I' * 998 + 'Z')])).real}")
+
+    # A recorded Bell circuit is replayed on the tableau automatically
+    bell = QuantumCircuit(2)
+    bell.apply_gate(H, [0])
+    bell.apply_two_qubit_gate(CNOT, 0, 1)
+    replayed = simulate(bell.operations, 2)
+    print(f"{type(replayed).__name__}: {replayed.probabilities()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measure how gate throughput scales with the number of kernel threads.
+
+Usage: ``python thread_benchmark.py [qubits ...]``.  Thread counts double
+from 1 up to the number of cores; set ``QUANTUM_THREADS=1,2,3,...`` to choose
+them explicitly.  A 28-qubit complex128 state needs 4 GiB plus up to 5 GiB of
+kernel scratch memory.
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+from quantum import QuantumCircuit, H, CNOT, RZ
+
+
+def thread_counts():
+    """Return the thread counts to benchmark."""
+    if os.environ.get("QUANTUM_THREADS"):
+        return [int(t) for t in os.environ["QUANTUM_THREADS"].split(",")]
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def layer(qc, rz):
+    """Apply H and RZ to every qubit, then a CNOT ladder; return the gate count."""
+    n = qc.num_qubits
+    qc.apply_gate(H, range(n))
+    qc.apply_gate(rz, range(n))
+    for q in range(n - 1):
+        qc.apply_two_qubit_gate(CNOT, q, q + 1)
+    return 3 * n - 1
+
+
+def benchmark(num_qubits, threads, layers=2):
+    """Return the mean seconds per gate with ``threads`` kernel threads."""
+    qc = QuantumCircuit(num_qubits, num_threads=threads)
+    rz = RZ(0.3)
+    layer(qc, rz)  # warm up scratch buffers and the thread pool
+    start = time.perf_counter()
+    gates = sum(layer(qc, rz) for _ in range(layers))
+    return (time.perf_counter() - start) / gates
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20, 22, 24]
+    counts = thread_counts()
+    print(f"{os.cpu_count()} cores available")
+    print(f"{'qubits':>6} {'threads':>7} {'per gate':>10} {'speedup':>8} {'efficiency':>10}")
+    for n in sizes:
+        base = None
+        for threads in counts:
+            t = benchmark(n, threads)
+            base = base or t
+            print(
+                f"{n:>6} {threads:>7} {t * 1e3:>8.2f}ms {base / t:>7.2f}x"
+                f" {base / t / threads:>9.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
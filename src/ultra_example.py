@@ -1,12 +1,14 @@
 """Showcase advanced 'ultra' modules with a noisy device."""
 
+import asyncio
 import os
 import sys
 
 sys.path.append(os.path.dirname(__file__))
 
 from algorithms.grover import grover_search
-from quantum.ultra import QuantumOrchestrator, SimulatedDevice
+from quantum import H, CNOT
+from quantum.ultra import QuantumOrchestrator, SimulatedDevice, ResultCache, ShardedCircuit
 from quantum.advanced.noise_models import AmplitudeDamping
 
 
@@ -15,7 +17,8 @@ def main():
     circuit1 = grover_search(2, oracle)
     circuit2 = grover_search(2, oracle)
 
-    orchestrator = QuantumOrchestrator()
+    cache = ResultCache()
+    orchestrator = QuantumOrchestrator(cache=cache)
     device_a = SimulatedDevice(noise_model=AmplitudeDamping(0.2), noise_level=0.2)
     device_b = SimulatedDevice(noise_model=AmplitudeDamping(0.1), noise_level=0.1)
     orchestrator.register_device(device_a)
@@ -24,6 +27,28 @@ def main():
     results = orchestrator.run_batch([circuit1, circuit2])
     print(f"Noisy Grover results: {results}")
 
+    histograms = orchestrator.run_batch(
+        [grover_search(2, oracle), grover_search(2, oracle)],
+        executor="process",
+        shots=1000,
+    )
+    print(f"Noisy Grover histograms (process pool): {histograms}")
+
+    async def stream():
+        for _ in range(4):
+            orchestrator.submit(grover_search(2, oracle))
+        return [result async for result in orchestrator.as_completed()]
+
+    print(f"Streamed results: {asyncio.run(stream())}")
+    print(f"Result cache: {cache.stats()}")
+
+    # A GHZ state over four worker processes, each holding a quarter of it
+    with ShardedCircuit(12, global_qubits=2) as ghz:
+        ghz.apply_gate(H, [0])
+        for q in range(11):
+            ghz.apply_two_qubit_gate(CNOT, q, q + 1)
+        print(f"Sharded GHZ samples: {ghz.sample(100, seed=0)}")
+
 
 if __name__ == "__main__":
     main()